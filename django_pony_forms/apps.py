@@ -0,0 +1,22 @@
+from django.apps import AppConfig
+from django.conf import settings
+from django.core import checks
+from django.db import connections
+
+
+class PonyFormsConfig(AppConfig):
+    name = 'django_pony_forms'
+    verbose_name = 'Pony forms'
+
+    def ready(self):
+        from .checks import check_fieldset_definitions
+
+        checks.register(check_fieldset_definitions)
+
+        if getattr(settings, 'PONY_FORMS_PRELOAD', False):
+            from .warmup import warm_up
+
+            warm_up()
+
+            # Creating the forms may have opened database connections. Don't share them with forked workers.
+            connections.close_all()
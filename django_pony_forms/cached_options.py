@@ -0,0 +1,178 @@
+"""
+Cache for the options of select widgets.
+
+The html of the options is rendered once for each list of choices, language and widget. A row renders the widget
+without choices, and inserts the cached options with 'selected' for the current value.
+
+The first render of a widget is compared with a normal render. If the html is different, for example because a
+project overrides the widget templates, then the widget is always rendered as usual.
+"""
+import copy
+import hashlib
+import re
+
+from django import forms
+from django.utils.encoding import force_str
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
+
+from .caches import option_cache
+
+
+OPTION_VALUE_PATTERN = re.compile(r'<option value="([^"]*)"')
+SELECTED = ' selected'
+END_TAG = '</select>'
+
+
+def can_cache(field):
+    """
+    Can the options of this field be cached? Only for select widgets with a fixed list of choices.
+    """
+    widget = field.widget
+
+    return (
+        isinstance(widget, forms.Select) and
+        not widget.option_inherits_attrs and
+        type(widget).optgroups is forms.Select.optgroups and
+        type(widget).create_option is forms.Select.create_option and
+        isinstance(widget.choices, (list, tuple)) and
+        not field.show_hidden_initial and
+        not field.localize
+    )
+
+
+def render(widget, value, render_widget, renderer):
+    """
+    Render the widget with cached options.
+
+    'render_widget' is a function(widget, value) that renders the widget as usual.
+    """
+    key = get_key(widget, renderer)
+    options = option_cache.get(key)
+
+    if options is None:
+        html = render_widget(widget, value)
+
+        options = CachedOptions.create(widget, render_widget)
+
+        if options is not None and options.render(widget, value, render_widget) != html:
+            options = None
+
+        # False: don't try again
+        option_cache.set(key, options or False)
+
+        return html
+    elif options is False:
+        return render_widget(widget, value)
+    else:
+        return options.render(widget, value, render_widget)
+
+
+def get_key(widget, renderer):
+    choices_and_attrs = (
+        normalize_choices(widget.choices),
+        sorted((key, force_str(value)) for (key, value) in widget.attrs.items()),
+    )
+
+    return (
+        type(widget),
+        type(renderer),
+        widget.template_name,
+        widget.option_template_name,
+        widget.allow_multiple_selected,
+        get_language(),
+        hashlib.sha1(repr(choices_and_attrs).encode('utf-8')).hexdigest(),
+    )
+
+
+def normalize_choices(choices):
+    """
+    Choices as strings, in the same way as they are rendered
+    """
+    return tuple(
+        (
+            u'' if value is None else force_str(value),
+            normalize_choices(label) if isinstance(label, (list, tuple)) else force_str(label)
+        )
+        for (value, label) in choices
+    )
+
+
+def render_shell(widget, value, render_widget):
+    """
+    Render the widget without choices. Returns the html before and after the options, or None.
+    """
+    shell_widget = copy.copy(widget)
+    shell_widget.choices = []
+
+    html = str(render_widget(shell_widget, value))
+    end = html.rfind(END_TAG)
+
+    if end == -1:
+        return None
+    else:
+        return (html[:end], html[end:])
+
+
+class CachedOptions:
+    __slots__ = ('html', 'positions')
+
+    def __init__(self, html, positions):
+        # Html of the options without 'selected'
+        self.html = html
+
+        # Where to insert 'selected', by option value
+        self.positions = positions
+
+    @classmethod
+    def create(cls, widget, render_widget):
+        shell = render_shell(widget, [], render_widget)
+
+        if shell is None:
+            return None
+
+        (start, end) = shell
+
+        # With an empty list as value, no option is selected
+        html = str(render_widget(widget, []))
+
+        if not (html.startswith(start) and html.endswith(end)):
+            return None
+
+        options_html = html[len(start):len(html) - len(end)]
+        positions = dict()
+
+        for match in OPTION_VALUE_PATTERN.finditer(options_html):
+            positions.setdefault(match.group(1), []).append(match.end())
+
+        return cls(options_html, {key: tuple(value) for (key, value) in positions.items()})
+
+    def render(self, widget, value, render_widget):
+        values = widget.format_value(value)
+        shell = render_shell(widget, value, render_widget)
+
+        if shell is None or not isinstance(values, list):
+            return render_widget(widget, value)
+
+        selected_positions = []
+
+        for option_value in values:
+            selected_positions.extend(self.positions.get(escape(option_value), ()))
+
+        if not widget.allow_multiple_selected:
+            # Only the first option with the value is selected
+            selected_positions = [min(selected_positions)] if selected_positions else []
+
+        parts = [shell[0]]
+        start = 0
+
+        for position in sorted(set(selected_positions)):
+            parts.append(self.html[start:position])
+            parts.append(SELECTED)
+            start = position
+
+        parts.append(self.html[start:])
+        parts.append(shell[1])
+
+        return mark_safe(u''.join(parts))
@@ -0,0 +1,191 @@
+from collections import OrderedDict, namedtuple
+from pathlib import Path
+from threading import Lock
+
+from django.core.cache import caches
+from django.dispatch import receiver
+from django.template import engines
+from django.test.signals import setting_changed
+from django.utils.autoreload import autoreload_started, file_changed
+from django.utils.safestring import mark_safe
+
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class LRUCache:
+    """
+    Thread safe cache with a maximum size. The least recently used entry is evicted first.
+    """
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            else:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_set(self, key, create_value):
+        """
+        Get the value for the key. If it's not in the cache, then call create_value() and store the result.
+
+        create_value is called outside the lock, so two threads may create the same value. The last one wins.
+        """
+        sentinel = object()
+        value = self.get(key, sentinel)
+
+        if value is sentinel:
+            value = create_value()
+            self.set(key, value)
+
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+
+class FragmentCache:
+    """
+    Stores rendered html in a Django cache backend. Counts the hits and misses.
+    """
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = Lock()
+
+    def get_or_render(self, alias, key, timeout, render):
+        cache = caches[alias]
+        html = cache.get(key)
+
+        with self._lock:
+            if html is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if html is None:
+            html = str(render())
+            cache.set(key, html, timeout)
+
+        return mark_safe(html)
+
+    def clear_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, None, None)
+
+
+# Templates by (engine alias, template name)
+template_cache = LRUCache(maxsize=256)
+
+# Variables that are used by a template, by template
+template_variables_cache = LRUCache(maxsize=256)
+
+# Render plans by form class and field structure
+render_plan_cache = LRUCache(maxsize=512)
+
+# Label titles, label tags and help texts, by label or help text and language
+label_cache = LRUCache(maxsize=1024)
+
+# Row skeletons, by form class, field, row template and language
+skeleton_cache = LRUCache(maxsize=1024)
+
+# Html of the options of select widgets, by widget type, choices and language
+option_cache = LRUCache(maxsize=128)
+
+# Html of rows, by form class, field, row template, value, errors, choices and language
+row_fragment_cache = LRUCache(maxsize=2048)
+
+# Html of unbound forms and their rows
+fragment_cache = FragmentCache()
+
+
+def clear_template_caches():
+    template_cache.clear()
+    template_variables_cache.clear()
+    skeleton_cache.clear()
+    row_fragment_cache.clear()
+    label_cache.clear()
+
+
+def get_template_directories():
+    """
+    The directories of all template engines, including the template directories of the apps
+    """
+    return set(
+        Path(directory).resolve()
+        for backend in engines.all()
+        for directory in backend.template_dirs
+    )
+
+
+@receiver(autoreload_started)
+def watch_template_directories(sender, **kwargs):
+    # Django versions before 3.2 don't watch the template files
+    for directory in get_template_directories():
+        sender.watch_dir(directory, '**/*')
+
+
+@receiver(file_changed)
+def clear_template_cache_on_file_change(sender, file_path, **kwargs):
+    clear_template_caches()
+
+    # A changed template doesn't need a reload. For other files, don't return a value; the autoreloader must still
+    # reload the code.
+    if file_path.suffix != '.py' and any(
+        directory in file_path.resolve().parents for directory in get_template_directories()
+    ):
+        reset_template_loaders()
+        return True
+
+
+def reset_template_loaders():
+    # Same as Django 3.2 and later: empty the cached loaders
+    for backend in engines.all():
+        for loader in getattr(getattr(backend, 'engine', None), 'template_loaders', ()):
+            if hasattr(loader, 'reset'):
+                loader.reset()
+
+
+@receiver(setting_changed)
+def clear_template_cache_on_setting_change(sender, setting, **kwargs):
+    if setting == 'TEMPLATES':
+        clear_template_caches()
@@ -0,0 +1,32 @@
+from django.core import checks
+
+from .pony_forms import form_classes
+
+
+def check_fieldset_definitions(app_configs, **kwargs):
+    """
+    Warn about fieldset definitions with unknown field names. Only the declared fields of a form are known; add the
+    check id to SILENCED_SYSTEM_CHECKS if a form adds fields in __init__.
+    """
+    errors = []
+
+    for form_class in sorted(list(form_classes), key=lambda c: (c.__module__, c.__qualname__)):
+        base_fields = getattr(form_class, 'base_fields', None)
+
+        if base_fields is None:
+            continue
+
+        for (key, field_names) in form_class.fieldset_definitions.items():
+            for field_name in field_names or ():
+                if field_name not in base_fields:
+                    errors.append(
+                        checks.Warning(
+                            "Fieldset '{0!s}' of {1!s}.{2!s} has an unknown field '{3!s}'".format(
+                                key, form_class.__module__, form_class.__qualname__, field_name
+                            ),
+                            obj=form_class,
+                            id='django_pony_forms.W001',
+                        )
+                    )
+
+    return errors
@@ -0,0 +1,143 @@
+"""
+Python versions of the default templates. They produce the same html as the templates, but they don't need a
+template engine.
+
+A function is only used for the template file that it replaces. If a project overrides a default template, or a form
+uses another template name, then the template is rendered as usual.
+"""
+import os
+
+from django.utils.formats import localize
+from django.utils.html import conditional_escape
+from django.utils.safestring import mark_safe
+from django.utils.timezone import template_localtime
+
+
+def render_value(value):
+    """
+    Same as {{ value }} in a Django template with autoescape
+    """
+    value = localize(template_localtime(value))
+
+    if not isinstance(value, str):
+        value = str(value)
+
+    return conditional_escape(value)
+
+
+def render_jinja2_value(value):
+    """
+    Same as {{ value }} in a Jinja2 template with autoescape
+    """
+    from markupsafe import escape
+
+    return escape(value)
+
+
+def render_base_form(context):
+    return mark_safe(_render_base_form(context, render_value))
+
+
+def render_errorlist(context):
+    return mark_safe(_render_errorlist(context, render_value))
+
+
+def render_label(context):
+    return mark_safe(_render_label(context, render_value))
+
+
+def render_row(context):
+    return mark_safe(_render_row(context, render_value, render_value))
+
+
+# The Jinja2 templates use the 'safe' filter for the html values
+
+def render_jinja2_base_form(context):
+    return _render_base_form(context, str)
+
+
+def render_jinja2_errorlist(context):
+    return _render_errorlist(context, render_jinja2_value)
+
+
+def render_jinja2_label(context):
+    return _render_label(context, render_jinja2_value)
+
+
+def render_jinja2_row(context):
+    return _render_row(context, render_jinja2_value, str)
+
+
+def _render_base_form(context, render_html):
+    return u'{0!s}\n{1!s}\n{2!s}\n'.format(
+        render_html(context['hidden_fields']),
+        render_html(context['top_errors']),
+        render_html(context['rows']),
+    )
+
+
+def _render_errorlist(context, render_value):
+    errors = context['errors']
+
+    if not errors:
+        return u'\n'
+    else:
+        return u'\n    <ul class="errorlist">\n        {0!s}\n    </ul>\n\n'.format(
+            u''.join(
+                u'\n            <li>{0!s}</li>\n        '.format(render_value(e)) for e in errors
+            )
+        )
+
+
+def _render_label(context, render_value):
+    return u'<label for="{0!s}">{1!s}</label>'.format(
+        render_value(context['id']),
+        render_value(context['label']),
+    )
+
+
+def _render_row(context, render_value, render_html):
+    css_classes = context['css_classes']
+    help_text = context['help_text']
+
+    return u'{0!s}\n<div class="form-row{1!s}" id="row-{2!s}">\n    {3!s}\n    {4!s}\n    {5!s}\n</div>\n'.format(
+        render_html(context['errors']),
+        u' {0!s}'.format(render_value(css_classes)) if css_classes else u'',
+        render_value(context['name']),
+        render_html(context['label']),
+        render_html(context['field']),
+        u'\n        <span class="helptext">{0!s}</span>\n    '.format(render_value(help_text)) if help_text else u'',
+    )
+
+
+def _get_template_path(engine_dir, template_name):
+    return os.path.normcase(
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), engine_dir, 'django_pony_forms', template_name)
+    )
+
+
+render_functions = {
+    _get_template_path('templates', 'base_form.html'): render_base_form,
+    _get_template_path('templates', 'errorlist.html'): render_errorlist,
+    _get_template_path('templates', 'label.html'): render_label,
+    _get_template_path('templates', 'row.html'): render_row,
+    _get_template_path('jinja2', 'base_form.html'): render_jinja2_base_form,
+    _get_template_path('jinja2', 'errorlist.html'): render_jinja2_errorlist,
+    _get_template_path('jinja2', 'label.html'): render_jinja2_label,
+    _get_template_path('jinja2', 'row.html'): render_jinja2_row,
+}
+
+
+def get_render_function(template):
+    """
+    Get the function that replaces this template, or None.
+
+    'template' is a template from a Django template backend.
+    """
+    origin = getattr(template, 'origin', None)
+    file_name = getattr(origin, 'name', None)
+
+    if not file_name:
+        return None
+    else:
+        return render_functions.get(os.path.normcase(os.path.abspath(file_name)))
@@ -0,0 +1,111 @@
+"""
+Timing of the phases of rendering a form.
+
+Instrumentation is disabled until a listener is added. A listener is called with a RenderEvent for each phase:
+
+- form: render the form template
+- row: render a row
+- label: render the label tag of a row
+- widget: render the widget of a row
+- errorlist: render an errorlist
+- update_row_context: call the update_row_context hook of the form
+- update_rows_context: call the update_rows_context hook of the form or the formset
+- template_lookup: get a template; 'cache_hit' tells if it was in the template cache
+"""
+from collections import namedtuple
+from threading import Lock
+from time import perf_counter
+
+
+RenderEvent = namedtuple(
+    'RenderEvent',
+    ['phase', 'form', 'field_name', 'template_name', 'duration', 'cache_hit']
+)
+
+# Is there a listener? Check this before measuring, so instrumentation costs nothing when it's disabled.
+enabled = False
+
+_listeners = []
+_lock = Lock()
+
+
+def add_listener(listener):
+    global enabled
+
+    with _lock:
+        _listeners.append(listener)
+        enabled = True
+
+
+def remove_listener(listener):
+    global enabled
+
+    with _lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+        enabled = bool(_listeners)
+
+
+def measure(phase, function, form, field_name=None, template_name=None, cache_hit=None):
+    """
+    Call function() and send the duration to the listeners
+    """
+    start = perf_counter()
+    result = function()
+    duration = perf_counter() - start
+
+    event = RenderEvent(phase, form, field_name, template_name, duration, cache_hit)
+
+    for listener in list(_listeners):
+        listener(event)
+
+    return result
+
+
+def summarize(events):
+    """
+    Group events by form and by row. Returns a list of dicts with only simple values.
+    """
+    forms = dict()
+
+    for event in events:
+        form_summary = forms.get(id(event.form))
+
+        if form_summary is None:
+            form_summary = dict(
+                form_class='{0!s}.{1!s}'.format(type(event.form).__module__, type(event.form).__qualname__),
+                duration=0,
+                templates_rendered=0,
+                template_cache_hits=0,
+                template_cache_misses=0,
+                rows=dict(),
+            )
+            forms[id(event.form)] = form_summary
+
+        if event.phase == 'form':
+            form_summary['duration'] += event.duration
+
+        if event.phase == 'template_lookup':
+            if event.cache_hit:
+                form_summary['template_cache_hits'] += 1
+            else:
+                form_summary['template_cache_misses'] += 1
+        elif event.template_name:
+            form_summary['templates_rendered'] += 1
+
+        if event.field_name:
+            row_summary = form_summary['rows'].setdefault(
+                event.field_name,
+                dict(name=event.field_name, row=0, label=0, widget=0, errorlist=0, update_row_context=0)
+            )
+
+            if event.phase in row_summary:
+                row_summary[event.phase] += event.duration
+
+    result = list(forms.values())
+
+    for form_summary in result:
+        form_summary['rows'] = list(form_summary['rows'].values())
+
+    return result
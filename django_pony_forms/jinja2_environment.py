@@ -0,0 +1,29 @@
+"""
+Jinja2 environment with a bytecode cache, so templates are compiled only once.
+
+Use it in the TEMPLATES setting:
+
+    TEMPLATES = [
+        dict(
+            BACKEND='django.template.backends.jinja2.Jinja2',
+            APP_DIRS=True,
+            OPTIONS=dict(environment='django_pony_forms.jinja2_environment.environment')
+        ),
+    ]
+
+The bytecode is stored in files, so new worker processes don't have to compile the templates. By default the files are
+in a directory for the user in the temp directory; set PONY_FORMS_JINJA2_BYTECODE_CACHE_DIR to use another directory.
+"""
+from django.conf import settings
+from jinja2 import Environment, FileSystemBytecodeCache
+
+
+def get_bytecode_cache():
+    # Jinja2 uses the temp directory if the directory is None
+    return FileSystemBytecodeCache(getattr(settings, 'PONY_FORMS_JINJA2_BYTECODE_CACHE_DIR', None) or None)
+
+
+def environment(**options):
+    options.setdefault('bytecode_cache', get_bytecode_cache())
+
+    return Environment(**options)
@@ -0,0 +1,38 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from django_pony_forms.warmup import warm_up
+
+
+class Command(BaseCommand):
+    help = 'Load the templates and build the render plans of the pony forms, and report the timing per form'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'forms', nargs='*',
+            help='Dotted paths of form classes. Default: the PONY_FORMS_WARMUP_FORMS setting'
+        )
+
+    def handle(self, *args, **options):
+        start = perf_counter()
+        results = warm_up(options['forms'] or None)
+        duration = perf_counter() - start
+
+        for result in results:
+            name = '{0!s}.{1!s}'.format(result.form_class.__module__, result.form_class.__qualname__)
+
+            if result.error is None:
+                self.stdout.write(
+                    '{0:>8.2f} ms  {1!s} ({2:d} templates)'.format(
+                        result.duration * 1000, name, len(result.template_names)
+                    )
+                )
+            else:
+                self.stdout.write(
+                    self.style.ERROR('{0:>8.2f} ms  {1!s}: {2!r}'.format(result.duration * 1000, name, result.error))
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS('Warmed up {0:d} forms in {1:.2f} ms'.format(len(results), duration * 1000))
+        )
@@ -0,0 +1,56 @@
+"""
+Panel for django-debug-toolbar that shows how much time rendering the pony forms takes.
+
+Add it to the panels in settings.py:
+
+    DEBUG_TOOLBAR_PANELS = [
+        ..
+        'django_pony_forms.panels.PonyFormsPanel',
+    ]
+"""
+from threading import get_ident
+
+from debug_toolbar.panels import Panel
+
+from . import instrumentation
+
+
+class PonyFormsPanel(Panel):
+    title = 'Pony forms'
+    template = 'django_pony_forms/debug_toolbar_panel.html'
+
+    def enable_instrumentation(self):
+        self._events = []
+        self._thread_id = get_ident()
+
+        instrumentation.add_listener(self._record_event)
+
+    def disable_instrumentation(self):
+        instrumentation.remove_listener(self._record_event)
+
+    def _record_event(self, event):
+        # Only record the events of this request
+        if get_ident() == self._thread_id:
+            self._events.append(event)
+
+    @property
+    def nav_subtitle(self):
+        forms = self.get_stats().get('forms', [])
+
+        return '{0:d} forms in {1:.1f} ms'.format(
+            len(forms),
+            sum(form['duration'] for form in forms)
+        )
+
+    def generate_stats(self, request, response):
+        forms = instrumentation.summarize(getattr(self, '_events', []))
+
+        # Milliseconds
+        for form in forms:
+            form['duration'] *= 1000
+
+            for row in form['rows']:
+                for phase in ['row', 'label', 'widget', 'errorlist', 'update_row_context']:
+                    row[phase] *= 1000
+
+        self.record_stats(dict(forms=forms))
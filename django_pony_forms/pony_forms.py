@@ -1,15 +1,158 @@
-from collections import OrderedDict
-from functools import lru_cache
+import hashlib
+import warnings
+from collections import namedtuple
+from types import MappingProxyType
+from weakref import WeakSet
+
+from django.conf import settings
+from django.core.cache import caches
+from django.forms import FileField
+from django.forms.models import ModelChoiceField, ModelChoiceIterator
+from django.forms.utils import ErrorDict
 from django.utils.encoding import force_str
 from django.utils.safestring import mark_safe
-from django.core.exceptions import NON_FIELD_ERRORS
-from django.utils.translation import gettext_lazy
+from django.core.exceptions import NON_FIELD_ERRORS, EmptyResultSet, ValidationError
+from django.utils.translation import get_language, gettext
 from django.template.loader import get_template
 from django.utils.functional import cached_property
-from django.forms.boundfield import BoundField
 
+from . import cached_options, fast_renderer, instrumentation, queries, row_fragments, schema, skeletons
+from .caches import (
+    fragment_cache, label_cache, render_plan_cache, template_cache, template_variables_cache
+)
 
-class PonyFormMixin:
+
+ROWS_PLACEHOLDER = '\x00django_pony_forms:rows\x00'
+LABEL_ID_MARKER = '\x00django_pony_forms:label_id\x00'
+
+# All subclasses of PonyFormMixin
+form_classes = WeakSet()
+
+
+def is_async_template(template):
+    """
+    Is this a template from a Jinja2 environment with enable_async?
+    """
+    environment = getattr(getattr(template, 'template', None), 'environment', None)
+
+    return getattr(environment, 'is_async', False)
+
+
+async def render_template_async(template, context):
+    # Same as the render method of the Django Jinja2 backend without a request
+    return await template.template.render_async(
+        get_template_context(template, context)
+    )
+
+
+async def call_sync(function):
+    """
+    Call a synchronous function from async code, in a thread where the database can be used
+    """
+    # asgiref comes with Django 3.0 and later; Django 2.2 has no async rendering
+    from asgiref.sync import sync_to_async
+
+    return await sync_to_async(function)()
+
+
+def get_template_variables(template):
+    """
+    Get the names of the variables that a Jinja2 template uses. Returns None if this is unknown, for example for
+    Django templates or for templates that extend or include other templates.
+    """
+    jinja_template = getattr(template, 'template', None)
+    environment = getattr(jinja_template, 'environment', None)
+
+    if environment is None or environment.loader is None:
+        return None
+
+    def find_variables():
+        from jinja2 import meta
+
+        source = environment.loader.get_source(environment, jinja_template.name)[0]
+        ast = environment.parse(source)
+
+        if list(meta.find_referenced_templates(ast)):
+            return None
+        else:
+            return frozenset(meta.find_undeclared_variables(ast))
+
+    return template_variables_cache.get_or_set(template, find_variables)
+
+
+def get_template_context(template, context):
+    """
+    Get the context for rendering a template.
+
+    A Django template gets a LazyContext as it is; it only evaluates the values that it uses. Jinja2 copies the
+    context, so a Jinja2 template gets a dict with only the values that the template uses.
+    """
+    if isinstance(context, LazyContext) and is_jinja2_template(template):
+        variables = get_template_variables(template)
+
+        if variables is not None:
+            return {key: context[key] for key in variables if key in context}
+
+    return context
+
+
+def get_cached_template(template_engine, template_name):
+    """
+    Get a template from the template cache. The key is the engine alias and the template name.
+    """
+    return template_cache.get_or_set(
+        (template_engine, template_name),
+        lambda: get_template(template_name, using=template_engine)
+    )
+
+
+def is_jinja2_template(template):
+    return hasattr(getattr(template, 'template', None), 'environment')
+
+
+def iter_error_messages(validation_error):
+    """
+    Yield (message, code) for each error of a ValidationError
+    """
+    for error in validation_error.error_list:
+        message = error.message
+
+        if error.params:
+            message %= error.params
+
+        yield (message, error.code)
+
+
+class TemplateRenderMixin:
+    # Render the default templates without a template engine
+    use_fast_renderer = False
+
+    def _render_template(self, template_name, context):
+        template = self._get_template_by_name(template_name)
+
+        if self.use_fast_renderer:
+            render_function = fast_renderer.get_render_function(template)
+
+            if render_function:
+                return render_function(context)
+
+        return template.render(
+            get_template_context(template, context)
+        )
+
+    def _get_template_by_name(self, template_name):
+        template_engine = getattr(self, 'template_engine', None)
+
+        if instrumentation.enabled:
+            return instrumentation.measure(
+                'template_lookup', lambda: get_cached_template(template_engine, template_name), self,
+                template_name=template_name, cache_hit=(template_engine, template_name) in template_cache
+            )
+        else:
+            return get_cached_template(template_engine, template_name)
+
+
+class PonyFormMixin(TemplateRenderMixin):
     form_template = 'django_pony_forms/base_form.html'
     row_template = 'django_pony_forms/row.html'
     errorlist_template = 'django_pony_forms/errorlist.html'
@@ -17,27 +160,503 @@ class PonyFormMixin:
 
     fieldset_definitions = dict()
     custom_row_templates = dict()
+
+    # Render a fieldset with this template. If it's None, then a fieldset renders only its rows.
+    fieldset_template = None
     required_css_class = 'required'
 
+    # Cache the html of unbound forms
+    use_fragment_cache = False
+    fragment_cache_alias = 'default'
+    fragment_cache_timeout = 300
+
+    # Cache the results of validating a field
+    use_validation_cache = False
+    validation_cache_alias = 'default'
+    validation_cache_timeout = 300
+    validation_cache_exclude = ()
+
+    # Cache the options of select widgets
+    use_option_cache = False
+
+    # Render the rows by filling the holes of a skeleton
+    use_row_skeletons = False
+
+    # Cache the html of rows by value and errors
+    use_row_fragment_cache = False
+
+    # Set by a formset with an update_rows_context hook
+    _rows_context_formset = None
+
+    # Call render_queries_exceeded if rendering the form or a row issues more queries
+    render_query_warning_threshold = None
+
+    # Is a render of this form counting the queries?
+    _counting_render_queries = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        form_classes.add(cls)
+
     def __str__(self):
-        template = self._get_template_by_name(self.form_template)
+        if self._fragment_cache_key is None:
+            return self._render()
+        else:
+            return fragment_cache.get_or_render(
+                self.fragment_cache_alias,
+                self._fragment_cache_key,
+                self.fragment_cache_timeout,
+                self._render
+            )
+
+    def _render(self):
+        if self.render_query_warning_threshold is None:
+            return self._render_measured()
+        else:
+            return self._count_render_queries(self._render_measured)
+
+    def _count_render_queries(self, render):
+        """
+        Call render() and call render_queries_exceeded if it issues more queries than render_query_warning_threshold.
+
+        The queries of the rows are counted with the form if they are rendered while the form is rendered. A row that
+        is rendered by itself, for example with {{ form.rows.name }}, is checked on its own.
+        """
+        if self._counting_render_queries:
+            return render()
+
+        self._counting_render_queries = True
+        try:
+            with queries.count_queries() as counter:
+                html = render()
+        finally:
+            self._counting_render_queries = False
+
+        if counter.count > self.render_query_warning_threshold:
+            self.render_queries_exceeded(counter.count, counter)
+
+        return html
+
+    def _render_measured(self):
+        if instrumentation.enabled:
+            return instrumentation.measure('form', self._render_form_template, self, template_name=self.form_template)
+        else:
+            return self._render_form_template()
+
+    def render_queries_exceeded(self, count, counter):
+        """
+        Called when rendering the form or a row issued more than render_query_warning_threshold queries. 'counter' has
+        the queries by row.
+
+        The PONY_FORMS_RENDER_QUERIES_MODE setting selects what happens: 'warn' (the default) issues a
+        RenderQueriesWarning, 'log' logs a warning and 'raise' raises RenderQueriesError.
+        """
+        message = '{0!s} issued {1:d} queries while rendering; the threshold is {2:d}. Queries by row: {3!s}'.format(
+            type(self).__qualname__, count, self.render_query_warning_threshold, counter.format_counts()
+        )
+        mode = getattr(settings, 'PONY_FORMS_RENDER_QUERIES_MODE', 'warn')
+
+        if mode == 'raise':
+            raise queries.RenderQueriesError(message)
+        elif mode == 'log':
+            queries.logger.warning(message)
+        else:
+            warnings.warn(message, queries.RenderQueriesWarning)
+
+    def _has_row_context_hooks(self):
+        return (
+            hasattr(self, 'update_row_context') or
+            hasattr(self, 'update_rows_context') or
+            self._rows_context_formset is not None
+        )
+
+    def _get_rows_context_update(self):
+        """
+        The result of the update_rows_context hook of the formset or the form, or None if there is no hook
+        """
+        if self._rows_context_formset is not None:
+            return self._rows_context_formset._rows_context_update
+        else:
+            return self._rows_context_update
+
+    @cached_property
+    def _rows_context_update(self):
+        if not hasattr(self, 'update_rows_context'):
+            return None
+
+        bound_fields = [self[field_name] for field_name in self._render_plan.visible_field_names]
+
+        if instrumentation.enabled:
+            return instrumentation.measure(
+                'update_rows_context', lambda: self.update_rows_context(bound_fields), self
+            )
+        else:
+            return self.update_rows_context(bound_fields)
+
+    @cached_property
+    def _model_choices(self):
+        """
+        Objects of model choice fields, by query. The forms of a formset share this dict.
+        """
+        return dict()
+
+    def _share_model_choices(self, field):
+        """
+        Evaluate the queryset of a model choice field only once for all rows and forms with the same query.
+
+        Only the objects are shared. The choices are made by the iterator of each field, so a field keeps its own
+        label_from_instance and empty_label. Replaces the choices of the widget by a list.
+        """
+        if (
+            not isinstance(field, ModelChoiceField) or
+            not isinstance(field.widget.choices, ModelChoiceIterator) or
+            field.iterator.__iter__ is not ModelChoiceIterator.__iter__
+        ):
+            return
+
+        queryset = field.queryset
+
+        try:
+            query_key = (queryset.db, queryset.model, str(queryset.query), tuple(queryset._prefetch_related_lookups))
+        except EmptyResultSet:
+            return
+
+        objects = self._model_choices.get(query_key)
+
+        if objects is None:
+            objects = list(queryset)
+            self._model_choices[query_key] = objects
+
+        iterator = field.iterator(field)
+
+        choices = [('', field.empty_label)] if field.empty_label is not None else []
+        choices.extend(iterator.choice(obj) for obj in objects)
+
+        field.widget.choices = choices
 
+    def _render_form_template(self):
         return mark_safe(
-            template.render(self._form_context_dict)
+            self._render_template(self.form_template, self._form_context_dict)
         )
 
+    @cached_property
+    def _fragment_cache_key(self):
+        """
+        Cache key for the html of the form, or None if the html must not be cached.
+
+        Only the html of unbound forms is cached. The key contains everything that changes the html of an unbound form:
+        the form class, the fields, the prefix, the initial values, the language, the templates and the renderer.
+
+        Forms with an update_row_context or update_rows_context hook, and forms with choices from a queryset or a
+        callable, are not cached: their html may be different for each user.
+        """
+        if not self.use_fragment_cache or self.is_bound or self._has_row_context_hooks():
+            return None
+
+        for field in self.fields.values():
+            choices = getattr(field, 'choices', None)
+
+            if choices is not None and not isinstance(choices, (list, tuple)):
+                return None
+
+        fields = tuple(
+            (
+                field_name,
+                type(field).__qualname__,
+                type(field.widget).__qualname__,
+                field.required,
+                field.disabled,
+                force_str(field.label),
+                force_str(field.help_text),
+                sorted((key, force_str(value)) for (key, value) in field.widget.attrs.items()),
+                [
+                    (force_str(value), force_str(label)) for (value, label) in field.choices
+                ] if isinstance(getattr(field, 'choices', None), (list, tuple)) else None,
+                force_str(self[field_name].value()),
+            )
+            for (field_name, field) in self.fields.items()
+        )
+
+        key_data = (
+            type(self).__module__,
+            type(self).__qualname__,
+            fields,
+            self.prefix,
+            self.auto_id,
+            get_language(),
+            getattr(self, 'template_engine', None),
+            self.form_template,
+            self.row_template,
+            self.errorlist_template,
+            self.label_template,
+            self.fieldset_template,
+            sorted(self.custom_row_templates.items()),
+            self.use_fast_renderer,
+            self.use_required_attribute,
+            self.label_suffix,
+            '{0!s}.{1!s}'.format(type(self.renderer).__module__, type(self.renderer).__qualname__),
+        )
+
+        return 'django_pony_forms:{0!s}'.format(
+            hashlib.sha1(repr(key_data).encode('utf-8')).hexdigest()
+        )
+
+    def iter_render(self):
+        """
+        Render the form in chunks. Yields the form template up to the rows, then each row, and then the rest of the
+        form template.
+
+        The result can be used in a StreamingHttpResponse.
+        """
+        context = self._form_context_dict.copy()
+        rows = context['rows']
+        context['rows'] = RowsPlaceholder(rows)
+
+        parts = self._render_template(self.form_template, context).split(ROWS_PLACEHOLDER)
+
+        for i, part in enumerate(parts):
+            if i > 0:
+                yield from rows.iter_render()
+
+            if part:
+                yield mark_safe(part)
+
+    async def arender(self):
+        """
+        Render the form in an async view.
+
+        The blocking work (loading templates, validation, rendering widgets) runs in one thread for the whole form.
+        With a Jinja2 environment that has enable_async, the templates are rendered with native async rendering.
+        Otherwise the form is rendered in the thread.
+        """
+        html = await call_sync(self._prepare_async_render)
+
+        if html is None:
+            context = self._form_context_dict
+
+            await context['top_errors']._arender_prepared()
+            await context['rows']._arender_prepared()
+
+            html = mark_safe(
+                await render_template_async(self._get_template_by_name(self.form_template), context)
+            )
+
+        return html
+
+    def _prepare_async_render(self):
+        if is_async_template(self._get_template_by_name(self.form_template)):
+            context = self._form_context_dict
+            context['top_errors']._prepare_async_render()
+            context['rows']._prepare_async_render()
+
+            return None
+        else:
+            return str(self)
+
     @cached_property
     def _form_context_dict(self):
         return FormContext(self).create_dict()
 
+    @cached_property
+    def _can_cache_label_tags(self):
+        """
+        Only the label tags of the label template of this package are cached. A custom label template may use other
+        values of the field.
+        """
+        return fast_renderer.get_render_function(self._get_template_by_name(self.label_template)) in (
+            fast_renderer.render_label, fast_renderer.render_jinja2_label
+        )
+
+    @cached_property
+    def _render_plan(self):
+        return RenderPlan.get_for_form(self)
+
+    @cached_property
+    def _render_plan_structure(self):
+        """
+        The field structure that selects the render plan
+        """
+        return tuple(
+            (field_name, field.widget.is_hidden, getattr(field.widget, 'renders_label', False))
+            for (field_name, field) in self.fields.items()
+        )
+
+    def get_schema(self):
+        """
+        The json schema of the form. Returns a Schema with the data as a dict, the data as json and the ETag.
+        """
+        return schema.get_schema(self)
+
+    def get_data_payload(self):
+        """
+        The values and the errors of the form, as a dict
+        """
+        return schema.get_data(self)
+
     def _get_row_template_name(self, field_name):
         return self.custom_row_templates.get(field_name, self.row_template)
 
-    @lru_cache()
-    def _get_template_by_name(self, template_name):
-        template_engine = getattr(self, 'template_engine', None)
+    def render_row(self, field_name):
+        """
+        Validate only this field and render its row. The clean method of the form is not called.
+
+        Use this for live validation of a single field.
+        """
+        self.partial_clean([field_name])
+
+        return self._render_partly_cleaned(lambda: RowContext(self[field_name], self))
+
+    def render_fieldset(self, key):
+        """
+        Validate only the fields of this fieldset and render the fieldset. The clean method of the form is not called.
+        """
+        field_names = self._render_plan.fieldsets[key]
+        self.partial_clean(field_names)
+
+        def create_fieldset():
+            return Fieldset(
+                key, self, ((field_name, RowContext(self[field_name], self)) for field_name in field_names)
+            )
+
+        return self._render_partly_cleaned(create_fieldset)
+
+    def partial_clean(self, field_names):
+        """
+        Validate only these fields: call field.clean and clean_<field_name>. The clean method of the form and the
+        model validation are skipped.
+
+        The results are in partial_errors and partial_cleaned_data. The form is not validated: errors and is_valid()
+        still validate all fields. If the form is already validated, then partial_errors are the errors of the form.
+        """
+        if self._errors is not None:
+            self.partial_errors = self._errors
+            self.partial_cleaned_data = getattr(self, 'cleaned_data', dict())
+            return
+
+        errors = ErrorDict()
+        cleaned_data = dict()
+
+        if self.is_bound:
+            # _clean_field and add_error use the errors and cleaned data of the form
+            self._errors = errors
+            self.cleaned_data = cleaned_data
+
+            try:
+                for field_name in field_names:
+                    self._clean_field(field_name)
+            finally:
+                self._errors = None
+                del self.cleaned_data
+
+        self.partial_errors = errors
+        self.partial_cleaned_data = cleaned_data
+
+    def _render_partly_cleaned(self, create_renderable):
+        """
+        Render new rows with the partial errors. The rows of the form are not used, because they keep their errors.
+        """
+        if self._errors is not None:
+            return str(create_renderable())
+
+        self._errors = self.partial_errors
+        try:
+            return str(create_renderable())
+        finally:
+            self._errors = None
+
+    def _clean_fields(self):
+        if not self.use_validation_cache:
+            return super(PonyFormMixin, self)._clean_fields()
+
+        for field_name in self.fields:
+            self._clean_field(field_name)
+
+    def _clean_field(self, field_name):
+        """
+        Clean a single field. Same as a step in the _clean_fields method of Django, but uses the validation cache.
+        """
+        field = self.fields[field_name]
+
+        if field.disabled:
+            value = self.get_initial_for_field(field, field_name)
+        else:
+            value = field.widget.value_from_datadict(self.data, self.files, self.add_prefix(field_name))
+
+        cache_key = self._get_validation_cache_key(field_name, field, value)
+
+        if cache_key is not None:
+            result = caches[self.validation_cache_alias].get(cache_key)
+
+            if result is not None:
+                self._apply_validation_result(field_name, result)
+                return
+
+        try:
+            if isinstance(field, FileField):
+                initial = self.get_initial_for_field(field, field_name)
+                value = field.clean(value, initial)
+            else:
+                value = field.clean(value)
+
+            self.cleaned_data[field_name] = value
+
+            if hasattr(self, 'clean_{0!s}'.format(field_name)):
+                value = getattr(self, 'clean_{0!s}'.format(field_name))()
+                self.cleaned_data[field_name] = value
+
+            result = (True, value)
+        except ValidationError as e:
+            self.add_error(field_name, e)
+
+            result = (False, [(force_str(message), code) for (message, code) in iter_error_messages(e)])
+
+        if cache_key is not None:
+            caches[self.validation_cache_alias].set(cache_key, result, self.validation_cache_timeout)
+
+    def _apply_validation_result(self, field_name, result):
+        (is_valid, value) = result
 
-        return get_template(template_name, using=template_engine)
+        if is_valid:
+            self.cleaned_data[field_name] = value
+        else:
+            self.add_error(
+                field_name,
+                ValidationError([ValidationError(message, code=code) for (message, code) in value])
+            )
+
+    def _get_validation_cache_key(self, field_name, field, value):
+        """
+        Cache key for the validation result of a field, or None if the result must not be cached.
+
+        The key contains the form class, the field name, the raw value, the language, whether the field is required and
+        the choices. Model choice fields and fields with callable choices are not cached: the form may limit their
+        choices, for example to the objects of the user.
+        """
+        choices = getattr(field, 'choices', None)
+
+        if (
+            not self.use_validation_cache or
+            field.disabled or
+            isinstance(field, (FileField, ModelChoiceField)) or
+            (choices is not None and not isinstance(choices, (list, tuple))) or
+            field_name in self.validation_cache_exclude
+        ):
+            return None
+
+        key_data = (
+            type(self).__module__,
+            type(self).__qualname__,
+            field_name,
+            hashlib.sha1(repr(value).encode('utf-8')).hexdigest(),
+            get_language(),
+            field.required,
+            hashlib.sha1(repr(choices).encode('utf-8')).hexdigest() if choices is not None else None,
+        )
+
+        return 'django_pony_forms:validation:{0!s}'.format(
+            hashlib.sha1(repr(key_data).encode('utf-8')).hexdigest()
+        )
 
     @property
     def rows(self):
@@ -56,38 +675,108 @@ class PonyFormMixin:
         return self._form_context_dict['fieldsets']
 
 
+class RenderPlan(namedtuple(
+    'RenderPlan',
+    [
+        'field_names', 'hidden_field_names', 'visible_field_names', 'row_templates', 'own_label_field_names',
+        'fieldsets', 'fieldset_index'
+    ]
+)):
+    """
+    Everything about rendering a form that doesn't depend on the form instance.
+
+    A plan is shared by all instances of a form class with the same field structure, row templates and fieldsets. If
+    a form changes self.fields, custom_row_templates or fieldset_definitions in __init__, then it gets another plan.
+    """
+    @classmethod
+    def get_for_form(cls, form):
+        structure = form._render_plan_structure
+
+        return render_plan_cache.get_or_set(
+            (
+                type(form),
+                form.row_template,
+                structure,
+                tuple(sorted(form.custom_row_templates.items())),
+                tuple(
+                    (key, tuple(field_names or ())) for (key, field_names) in form.fieldset_definitions.items()
+                ),
+            ),
+            lambda: cls.create(form, structure)
+        )
+
+    @classmethod
+    def create(cls, form, structure):
+        field_names = tuple(field_name for (field_name, _, _) in structure)
+        hidden_field_names = tuple(field_name for (field_name, is_hidden, _) in structure if is_hidden)
+        visible_field_names = tuple(field_name for (field_name, is_hidden, _) in structure if not is_hidden)
+
+        visible_field_set = set(visible_field_names)
+        fieldsets = dict()
+        fieldset_index = dict()
+
+        for (key, fieldset_field_names) in form.fieldset_definitions.items():
+            if fieldset_field_names:
+                fieldsets[key] = tuple(
+                    field_name for field_name in fieldset_field_names if field_name in visible_field_set
+                )
+
+                for field_name in fieldsets[key]:
+                    fieldset_index[field_name] = fieldset_index.get(field_name, ()) + (key,)
+
+        return cls(
+            field_names=field_names,
+            hidden_field_names=hidden_field_names,
+            visible_field_names=visible_field_names,
+            row_templates=MappingProxyType({
+                field_name: form._get_row_template_name(field_name) for field_name in visible_field_names
+            }),
+            own_label_field_names=frozenset(
+                field_name for (field_name, _, renders_label) in structure if renders_label
+            ),
+            fieldsets=MappingProxyType(fieldsets),
+            fieldset_index=MappingProxyType(fieldset_index),
+        )
+
+
 class FormContext(object):
     def __init__(self, form):
         self.form = form
 
     def create_dict(self):
-        return dict(
-            hidden_fields=self.hidden_field_dict,
-            fields=self.visible_fields_dict,
-            rows=self.rows,
-            top_errors=self.top_errors,
-            fieldsets=self.fieldsets
-        )
+        """
+        The context for the form template. A value is computed when it's used for the first time; only top_errors
+        validates the form.
+        """
+        return LazyContext(self.context_getters, self)
+
+    context_getters = dict(
+        hidden_fields=lambda form_context: form_context.hidden_field_dict,
+        fields=lambda form_context: form_context.visible_fields_dict,
+        rows=lambda form_context: form_context.rows,
+        top_errors=lambda form_context: form_context.top_errors,
+        fieldsets=lambda form_context: form_context.fieldsets,
+    )
 
     @cached_property
     def bound_field_dict(self):
-        return OrderedDict(
-            (field_name, BoundField(self.form, field, field_name))
-            for (field_name, field) in self.form.fields.items()
-        )
+        # Use the bound fields of the form, so they are shared with {{ form.field_name }}
+        return {
+            field_name: self.form[field_name] for field_name in self.form._render_plan.field_names
+        }
 
     @cached_property
     def hidden_field_dict(self):
         return RenderableDict(
-            (field_name, bound_field)
-            for (field_name, bound_field) in self.bound_field_dict.items() if bound_field.is_hidden
+            (field_name, self.bound_field_dict[field_name])
+            for field_name in self.form._render_plan.hidden_field_names
         )
 
     @cached_property
     def visible_fields_dict(self):
-        return OrderedDict(
-            (field_name, bound_field)
-            for (field_name, bound_field) in self.bound_field_dict.items() if not bound_field.is_hidden
+        return dict(
+            (field_name, self.bound_field_dict[field_name])
+            for field_name in self.form._render_plan.visible_field_names
         )
 
     @cached_property
@@ -120,7 +809,82 @@ class FormContext(object):
         return FieldsetsContext(self.form, self.rows)
 
 
-class RenderableDict(OrderedDict):
+class LazyContext(dict):
+    """
+    Template context that computes a value when it is used for the first time.
+
+    'getters' is a dict of functions that get the value from 'obj'. Values that are set in the dict directly override
+    the getters.
+    """
+    __slots__ = ('_getters', '_obj')
+
+    def __init__(self, getters, obj):
+        super(LazyContext, self).__init__()
+
+        self._getters = getters
+        self._obj = obj
+
+    def __getitem__(self, key):
+        try:
+            return dict.__getitem__(self, key)
+        except KeyError:
+            value = self._getters[key](self._obj)
+            dict.__setitem__(self, key, value)
+
+            return value
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key) or key in self._getters
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        else:
+            return default
+
+    def keys(self):
+        return list(self._getters.keys()) + [key for key in dict.keys(self) if key not in self._getters]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def values(self):
+        return [self[key] for key in self.keys()]
+
+    def copy(self):
+        """
+        Copy with the same getters. Only the values that are already computed are copied.
+        """
+        context = LazyContext(self._getters, self._obj)
+        dict.update(context, dict.items(self))
+
+        return context
+
+
+class RenderableList(list):
+    __slots__ = ()
+
+    def __str__(self):
+        return mark_safe(
+            u''.join(
+                str(item) for item in self
+            )
+        )
+
+    def iter_render(self):
+        for item in self:
+            yield mark_safe(str(item))
+
+
+class RenderableDict(dict):
+    __slots__ = ()
+
     def __str__(self):
         return mark_safe(
             u''.join(
@@ -128,72 +892,351 @@ class RenderableDict(OrderedDict):
             )
         )
 
+    def iter_render(self):
+        for item in self.values():
+            yield mark_safe(str(item))
+
+    async def arender(self):
+        await call_sync(self._prepare_async_render)
+
+        return await self._arender_prepared()
+
+    def _prepare_async_render(self):
+        for item in self.values():
+            if hasattr(item, '_prepare_async_render'):
+                item._prepare_async_render()
+
+    async def _arender_prepared(self):
+        for item in self.values():
+            if hasattr(item, '_arender_prepared'):
+                await item._arender_prepared()
+
+        return str(self)
+
+
+class RowsPlaceholder(RenderableDict):
+    """
+    Rows that render as a placeholder. Used by iter_render to find the position of the rows in the form template.
+    """
+    __slots__ = ()
+
+    def __str__(self):
+        return mark_safe(ROWS_PLACEHOLDER)
+
 
 class RowContext(object):
+    __slots__ = (
+        '_bound_field', '_form', '_html', '_context_value', '_row_context_update_value', '_label_tag_value',
+        '_field_string', '_errorlist'
+    )
+
     def __init__(self, bound_field, form):
         super(RowContext, self).__init__()
 
         self._bound_field = bound_field
         self._form = form
+        self._html = None
+
+        # Computed on first use
+        self._context_value = None
+        self._row_context_update_value = None
+        self._label_tag_value = None
+        self._field_string = None
+        self._errorlist = None
 
     def __str__(self):
-        template_name = self._form._get_row_template_name(self._bound_field.name)
-        template = self._form._get_template_by_name(template_name)
+        if self._html is not None:
+            return self._html
+
+        form_cache_key = self._form._fragment_cache_key
+
+        if form_cache_key is None:
+            if self._form.use_row_fragment_cache:
+                return row_fragments.render(self)
+            else:
+                return self._render()
+        else:
+            return fragment_cache.get_or_render(
+                self._form.fragment_cache_alias,
+                '{0!s}:{1!s}'.format(form_cache_key, self._bound_field.name),
+                self._form.fragment_cache_timeout,
+                self._render
+            )
+
+    def _render(self):
+        if self._form.render_query_warning_threshold is None:
+            return self._render_attributed()
+        else:
+            return self._form._count_render_queries(self._render_attributed)
+
+    def _render_attributed(self):
+        if queries.is_counting():
+            with queries.attribute_to_row(self._bound_field.name):
+                return self._render_measured()
+        else:
+            return self._render_measured()
+
+    def _render_measured(self):
+        if instrumentation.enabled:
+            return instrumentation.measure(
+                'row', self._render_row_template, self._form,
+                field_name=self._bound_field.name, template_name=self._get_template_name()
+            )
+        else:
+            return self._render_row_template()
+
+    def _render_row_template(self):
+        if self._form.use_row_skeletons and not self._form._has_row_context_hooks():
+            html = skeletons.render(self)
+
+            if html is not None:
+                return html
 
         return mark_safe(
-            template.render(self._context)
+            self._form._render_template(self._get_template_name(), self._context)
         )
 
-    @cached_property
-    def _context(self):
-        label = self._get_label()
-        label_tag = self._get_label_tag(label)
-
-        context = dict(
-            label=label_tag,
-            label_title=label,
-            field=self.field_string,
-            html_name=self._bound_field.html_name,
-            id_for_label=self._bound_field.id_for_label,
-            name=self._bound_field.name,
-            css_classes=self._bound_field.css_classes(),
-            help_text=force_str(self._bound_field.field.help_text or u''),
-            errors=self.errorlist,
-            form=self._form,
-            bound_field=self._bound_field,
-            must_render_label=self.must_render_label,
-        )
+    async def arender(self):
+        await call_sync(self._prepare_async_render)
 
-        if hasattr(self._form, 'update_row_context'):
-            context.update(
-                self._form.update_row_context(self._bound_field)
+        return await self._arender_prepared()
+
+    def _prepare_async_render(self):
+        """
+        Do the blocking work for arender: load the templates, render the widget, get the errors and call
+        update_row_context. If the row template doesn't support async rendering, then render the row.
+        """
+        if is_async_template(self._get_template()):
+            self._form._get_template_by_name(self._form.label_template)
+            self.field_string
+            self._row_context_update
+            self.errorlist._prepare_async_render()
+        else:
+            self._html = str(self)
+
+    async def _arender_prepared(self):
+        if self._html is None:
+            if self._label_tag_value is None:
+                label_tag_context = self._get_label_tag_context(self._get_label())
+
+                if label_tag_context is None:
+                    self._label_tag_value = ''
+                else:
+                    self._label_tag_value = await render_template_async(
+                        self._form._get_template_by_name(self._form.label_template),
+                        label_tag_context
+                    )
+
+            await self.errorlist._arender_prepared()
+
+            self._html = mark_safe(
+                await render_template_async(self._get_template(), self._context)
             )
 
-        return context
+        return self._html
 
-    def _get_label(self):
-        if self._bound_field.label:
-            return gettext_lazy(force_str(self._bound_field.label))
+    def _get_template(self):
+        return self._form._get_template_by_name(self._get_template_name())
+
+    def _get_template_name(self):
+        return self._form._render_plan.row_templates[self._bound_field.name]
+
+    @property
+    def _context(self):
+        """
+        The context for the row template. The values are computed when the template uses them.
+
+        The result of update_row_context overrides the values.
+        """
+        if self._context_value is None:
+            self._context_value = LazyContext(self.context_getters, self)
+            self._context_value.update(self._row_context_update)
+
+        return self._context_value
+
+    context_getters = dict(
+        label=lambda row: row._label_tag,
+        label_title=lambda row: row._get_label(),
+        field=lambda row: row.field_string,
+        html_name=lambda row: row._bound_field.html_name,
+        id_for_label=lambda row: row._bound_field.id_for_label,
+        name=lambda row: row._bound_field.name,
+        css_classes=lambda row: row._bound_field.css_classes(),
+        help_text=lambda row: row._get_help_text(),
+        errors=lambda row: row.errorlist,
+        form=lambda row: row._form,
+        bound_field=lambda row: row._bound_field,
+        must_render_label=lambda row: row.must_render_label,
+    )
+
+    @property
+    def _row_context_update(self):
+        """
+        The extra values of the update_rows_context and update_row_context hooks. The values of update_row_context
+        override the values of update_rows_context.
+        """
+        if self._row_context_update_value is None:
+            rows_context_update = self._form._get_rows_context_update()
+
+            if rows_context_update is None:
+                update = self._call_update_row_context()
+            else:
+                update = dict(rows_context_update.get(self._bound_field, ()))
+                update.update(self._call_update_row_context())
+
+            self._row_context_update_value = update
+
+        return self._row_context_update_value
+
+    def _call_update_row_context(self):
+        if not hasattr(self._form, 'update_row_context'):
+            return dict()
+        elif instrumentation.enabled:
+            return instrumentation.measure(
+                'update_row_context', lambda: self._form.update_row_context(self._bound_field), self._form,
+                field_name=self._bound_field.name
+            )
         else:
+            return self._form.update_row_context(self._bound_field)
+
+    def _get_label(self):
+        """
+        The translated label. Cached by label and language.
+        """
+        label = self._bound_field.label
+
+        if not label:
             return ''
+        else:
+            return label_cache.get_or_set(
+                ('label_title', label, get_language()),
+                lambda: gettext(force_str(label))
+            )
 
-    def _get_label_tag(self, contents):
+    def _get_help_text(self):
+        help_text = self._bound_field.field.help_text
+
+        if not help_text:
+            return u''
+        elif isinstance(help_text, str):
+            return help_text
+        else:
+            # Lazy translation
+            return label_cache.get_or_set(
+                ('help_text', help_text, get_language()),
+                lambda: force_str(help_text)
+            )
+
+    @property
+    def _label_tag(self):
+        if self._label_tag_value is None:
+            label_tag_context = self._get_label_tag_context(self._get_label())
+
+            if label_tag_context is None:
+                self._label_tag_value = ''
+            elif not self._form._can_cache_label_tags:
+                self._label_tag_value = self._render_label_tag(label_tag_context)
+            else:
+                # The label tag without the id is shared by the rows of all forms, for example in a formset
+                parts = label_cache.get_or_set(
+                    self._get_label_tag_cache_key(),
+                    lambda: self._render_label_tag_parts(label_tag_context)
+                )
+
+                if parts is None:
+                    self._label_tag_value = self._render_label_tag(label_tag_context)
+                else:
+                    self._label_tag_value = mark_safe(
+                        u'{0!s}{1!s}{2!s}'.format(parts[0], self._render_label_id(label_tag_context['id']), parts[1])
+                    )
+
+        return self._label_tag_value
+
+    def _render_label_tag_parts(self, label_tag_context):
+        """
+        Render the label tag with a marker for the id. Returns the html before and after the id, or None if the id
+        isn't in the html exactly once.
+        """
+        html = str(self._render_label_tag(dict(label_tag_context, id=LABEL_ID_MARKER)))
+        parts = html.split(LABEL_ID_MARKER)
+
+        if len(parts) != 2:
+            return None
+        else:
+            return tuple(parts)
+
+    def _render_label_id(self, id_):
+        if is_jinja2_template(self._form._get_template_by_name(self._form.label_template)):
+            return fast_renderer.render_jinja2_value(id_)
+        else:
+            return fast_renderer.render_value(id_)
+
+    def _render_label_tag(self, label_tag_context):
+        if instrumentation.enabled:
+            return instrumentation.measure(
+                'label', lambda: self._form._render_template(self._form.label_template, label_tag_context),
+                self._form, field_name=self._bound_field.name, template_name=self._form.label_template
+            )
+        else:
+            return self._form._render_template(self._form.label_template, label_tag_context)
+
+    def _get_label_tag_cache_key(self):
+        """
+        The label tag depends on the label and the field. A changed label gives another key. The id is filled in.
+        """
+        form = self._form
+        bound_field = self._bound_field
+
+        return (
+            'label_tag',
+            type(form),
+            bound_field.name,
+            bound_field.label,
+            bound_field.field.required,
+            get_language(),
+            form.label_template,
+            getattr(form, 'template_engine', None),
+            form.use_fast_renderer,
+        )
+
+    def _get_label_tag_context(self, contents):
         bound_field = self._bound_field
         widget = bound_field.field.widget
         id_ = widget.attrs.get('id') or bound_field.auto_id
 
         if not id_:
-            return ''
+            return None
         else:
-            template = self._form._get_template_by_name(self._form.label_template)
+            return dict(id=id_, label=contents, field=bound_field.field)
 
-            return template.render(
-                dict(id=id_, label=contents, field=bound_field.field)
-            )
-
-    @cached_property
+    @property
     def field_string(self):
-        if self.must_render_label:
+        if self._field_string is None:
+            if queries.is_counting():
+                with queries.attribute_to_row(self._bound_field.name):
+                    self._field_string = self._render_field_measured()
+            else:
+                self._field_string = self._render_field_measured()
+
+        return self._field_string
+
+    def _render_field_measured(self):
+        if instrumentation.enabled:
+            return instrumentation.measure('widget', self._render_field, self._form, field_name=self._bound_field.name)
+        else:
+            return self._render_field()
+
+    def _render_field(self):
+        self._form._share_model_choices(self._bound_field.field)
+
+        if self._form.use_option_cache and cached_options.can_cache(self._bound_field.field):
+            result = cached_options.render(
+                self._bound_field.field.widget,
+                self._bound_field.value(),
+                self._get_render_widget_function(),
+                self._form.renderer
+            )
+        elif self.must_render_label:
             # Default: render boundfield which renders the label and the widget
             result = str(self._bound_field)
         else:
@@ -206,34 +1249,56 @@ class RowContext(object):
         """
         Render widget. The widget renders its own label
         """
+        return self._get_render_widget_function()(self._bound_field.field.widget, self._bound_field.value())
+
+    def _get_render_widget_function(self):
+        """
+        Get a function(widget, value) that renders the widget of the row. Same as rendering the bound field, or the
+        widget with its own label.
+        """
         bound_field = self._bound_field
         widget = bound_field.field.widget
 
-        attrs = bound_field.field.widget_attrs(widget)
-        auto_id = bound_field.auto_id
+        if self.must_render_label:
+            # Same as BoundField.as_widget
+            attrs = bound_field.build_widget_attrs({}, widget)
 
-        if auto_id and 'id' not in widget.attrs:
-            attrs['id'] = auto_id
+            if bound_field.auto_id and 'id' not in widget.attrs:
+                attrs['id'] = bound_field.auto_id
 
-        name = bound_field.html_name
+            def render_widget(widget, value):
+                return widget.render(
+                    name=bound_field.html_name, value=value, attrs=dict(attrs), renderer=self._form.renderer
+                )
+        else:
+            attrs = bound_field.field.widget_attrs(widget)
 
-        # Render widget widh 'label' attribute
-        return widget.render(name, bound_field.value(), attrs=attrs, label=self._get_label())
+            if bound_field.auto_id and 'id' not in widget.attrs:
+                attrs['id'] = bound_field.auto_id
 
-    @cached_property
+            label = self._get_label()
+
+            # Render widget with 'label' attribute
+            def render_widget(widget, value):
+                return widget.render(bound_field.html_name, value, attrs=dict(attrs), label=label)
+
+        return render_widget
+
+    @property
     def must_render_label(self):
         """
         Must we render the label?
 
         Not if the widget has the renders_label property. This means that the widget renders its own label.
         """
-        widget = self._bound_field.field.widget
+        return self._bound_field.name not in self._form._render_plan.own_label_field_names
 
-        return not getattr(widget, 'renders_label', False)
-
-    @cached_property
+    @property
     def errorlist(self):
-        return ErrorList(self._bound_field.errors, self._form)
+        if self._errorlist is None:
+            self._errorlist = ErrorList(self._bound_field.errors, self._form, self._bound_field.name)
+
+        return self._errorlist
 
     @property
     def name(self):
@@ -261,32 +1326,211 @@ class RowContext(object):
 
 
 class ErrorList(list):
-    def __init__(self, errors, form):
+    __slots__ = ('_form', '_html', '_field_name')
+
+    def __init__(self, errors, form, field_name=None):
         super(ErrorList, self).__init__(errors)
 
         self._form = form
+        self._html = None
+        self._field_name = field_name
 
     def __str__(self):
-        template = self._form._get_template_by_name(self._form.errorlist_template)
+        if self._html is not None:
+            return self._html
+        elif instrumentation.enabled:
+            return instrumentation.measure(
+                'errorlist', self._render, self._form,
+                field_name=self._field_name, template_name=self._form.errorlist_template
+            )
+        else:
+            return self._render()
+
+    def _render(self):
+        return self._form._render_template(self._form.errorlist_template, dict(errors=self))
+
+    async def arender(self):
+        await call_sync(self._prepare_async_render)
+
+        return await self._arender_prepared()
 
-        return template.render(dict(errors=self))
+    def _prepare_async_render(self):
+        if not is_async_template(self._get_template()):
+            self._html = str(self)
+
+    async def _arender_prepared(self):
+        if self._html is None:
+            self._html = await render_template_async(self._get_template(), dict(errors=self))
+
+        return self._html
+
+    def _get_template(self):
+        return self._form._get_template_by_name(self._form.errorlist_template)
 
 
 class FieldsetsContext:
+    """
+    The fieldsets of a form. A fieldset is created when it's used for the first time.
+
+    Iterate to get all fieldsets.
+    """
+    __slots__ = ('_form', '_rows', '_fieldsets')
+
     def __init__(self, form, rows):
         self._form = form
         self._rows = rows
+        self._fieldsets = dict()
 
     def __getitem__(self, key):
-        field_names = self._form.fieldset_definitions.get(key)
-        if not field_names:
-            return None
+        fieldset = self._fieldsets.get(key)
+
+        if fieldset is None:
+            field_names = self._form._render_plan.fieldsets.get(key)
+
+            if field_names is None:
+                return None
+            else:
+                fieldset = Fieldset(
+                    key,
+                    self._form,
+                    ((field_name, self._rows[field_name]) for field_name in field_names)
+                )
+                self._fieldsets[key] = fieldset
+
+        return fieldset
+
+    def __iter__(self):
+        for key in self._form._render_plan.fieldsets:
+            yield self[key]
+
+    def __len__(self):
+        return len(self._form._render_plan.fieldsets)
+
+
+class Fieldset(RenderableDict):
+    """
+    The rows of a fieldset. Renders the rows, or the fieldset_template of the form if it's set.
+    """
+    __slots__ = ('name', '_form', '_html')
+
+    def __init__(self, name, form, rows):
+        super(Fieldset, self).__init__(rows)
+
+        self.name = name
+        self._form = form
+        self._html = None
+
+    def __str__(self):
+        if self._html is None:
+            if self._form.fieldset_template is None:
+                self._html = super(Fieldset, self).__str__()
+            else:
+                self._html = mark_safe(
+                    self._form._render_template(self._form.fieldset_template, self._get_context(RenderableDict(self)))
+                )
+
+        return self._html
+
+    def _get_context(self, rows):
+        return dict(name=self.name, rows=rows, form=self._form)
+
+    def iter_render(self):
+        if self._form.fieldset_template is None:
+            yield from super(Fieldset, self).iter_render()
         else:
-            rows = [
-                self._rows[field_name]
-                for field_name in field_names if field_name in self._rows
-            ]
+            parts = self._form._render_template(
+                self._form.fieldset_template,
+                self._get_context(RowsPlaceholder(self))
+            ).split(ROWS_PLACEHOLDER)
+
+            for i, part in enumerate(parts):
+                if i > 0:
+                    yield from super(Fieldset, self).iter_render()
+
+                if part:
+                    yield mark_safe(part)
+
+    async def _arender_prepared(self):
+        for item in self.values():
+            await item._arender_prepared()
+
+        if self._html is None and self._form.fieldset_template is not None:
+            template = self._form._get_template_by_name(self._form.fieldset_template)
+
+            if is_async_template(template):
+                self._html = mark_safe(await render_template_async(template, self._get_context(RenderableDict(self))))
+
+        return str(self)
+
+
+class PonyFormSetMixin(TemplateRenderMixin):
+    """
+    Mixin for formsets. The forms of the formset must use PonyFormMixin.
+    """
+    formset_template = 'django_pony_forms/base_formset.html'
+    errorlist_template = 'django_pony_forms/errorlist.html'
+
+    def __str__(self):
+        return mark_safe(
+            self._render_template(self.formset_template, self._formset_context_dict)
+        )
+
+    @cached_property
+    def _formset_context_dict(self):
+        return LazyContext(self._formset_context_getters, self)
+
+    _formset_context_getters = dict(
+        hidden_fields=lambda formset: formset.hidden_fields,
+        top_errors=lambda formset: formset.top_errors,
+        forms=lambda formset: RenderableList(formset.forms),
+        rows=lambda formset: formset.rows,
+    )
+
+    @cached_property
+    def hidden_fields(self):
+        management_form = self.management_form
+
+        return RenderableDict(
+            (field_name, management_form[field_name]) for field_name in management_form.fields
+        )
+
+    @cached_property
+    def top_errors(self):
+        return ErrorList(self.non_form_errors(), self)
+
+    @cached_property
+    def _model_choices(self):
+        # Shared by the forms, so the forms evaluate the same queryset only once
+        return dict()
 
-            return RenderableDict(
-                (row.name, row) for row in rows
+    def _construct_form(self, i, **kwargs):
+        form = super(PonyFormSetMixin, self)._construct_form(i, **kwargs)
+        form._model_choices = self._model_choices
+
+        if hasattr(self, 'update_rows_context'):
+            form._rows_context_formset = self
+
+        return form
+
+    @cached_property
+    def _rows_context_update(self):
+        """
+        Call the update_rows_context hook of the formset once, with the visible bound fields of all forms
+        """
+        bound_fields = [
+            form[field_name] for form in self.forms for field_name in form._render_plan.visible_field_names
+        ]
+
+        if instrumentation.enabled:
+            return instrumentation.measure(
+                'update_rows_context', lambda: self.update_rows_context(bound_fields), self
             )
+        else:
+            return self.update_rows_context(bound_fields)
+
+    @cached_property
+    def rows(self):
+        """
+        The rows of each form
+        """
+        return RenderableList(form.rows for form in self.forms)
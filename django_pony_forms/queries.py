@@ -0,0 +1,119 @@
+"""
+Counting the database queries of a render.
+"""
+import logging
+import threading
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+# The active counters of this thread
+_local = threading.local()
+
+
+class RenderQueriesWarning(RuntimeWarning):
+    """
+    A form render issued more queries than render_query_warning_threshold
+    """
+
+
+class RenderQueriesError(Exception):
+    """
+    A form render issued more queries than render_query_warning_threshold, and PONY_FORMS_RENDER_QUERIES_MODE is
+    'raise'
+    """
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+        # Queries by the name of the row that issued them
+        self.counts_by_row = dict()
+        self.current_row = None
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+
+        if self.current_row is not None:
+            self.counts_by_row[self.current_row] = self.counts_by_row.get(self.current_row, 0) + 1
+
+        return execute(sql, params, many, context)
+
+    def format_counts(self):
+        """
+        The queries by row, for example: 'category: 3, tags: 2, other: 1'
+        """
+        counts = sorted(self.counts_by_row.items(), key=lambda item: (-item[1], item[0]))
+        other_count = self.count - sum(self.counts_by_row.values())
+
+        if other_count:
+            counts.append(('other', other_count))
+
+        return ', '.join('{0!s}: {1:d}'.format(name, count) for (name, count) in counts)
+
+
+@contextmanager
+def count_queries():
+    """
+    Count the queries on all database connections in this block:
+
+        with count_queries() as counter:
+            ..
+
+        counter.count
+    """
+    counter = QueryCounter()
+    counters = _get_counters()
+
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(counter))
+
+        counters.append(counter)
+        try:
+            yield counter
+        finally:
+            counters.remove(counter)
+
+
+def is_counting():
+    """
+    Is there an active counter in this thread?
+    """
+    return bool(getattr(_local, 'counters', None))
+
+
+@contextmanager
+def attribute_to_row(field_name):
+    """
+    Count the queries in this block for this row
+    """
+    counters = _get_counters()
+
+    if not counters:
+        yield
+    else:
+        previous_rows = [counter.current_row for counter in counters]
+
+        for counter in counters:
+            counter.current_row = field_name
+
+        try:
+            yield
+        finally:
+            for (counter, previous_row) in zip(counters, previous_rows):
+                counter.current_row = previous_row
+
+
+def _get_counters():
+    counters = getattr(_local, 'counters', None)
+
+    if counters is None:
+        counters = []
+        _local.counters = counters
+
+    return counters
@@ -0,0 +1,137 @@
+"""
+Row fragment cache: the html of rows, by form class, field, row template, value, errors, choices and language.
+
+When a bound form is rendered again, for example after a POST that doesn't validate, then the rows with the same value
+and errors come from the cache. Only the rows that changed are rendered.
+
+The first render of a row template records the values that it uses. A row is always rendered as usual if the template
+uses 'form' or 'bound_field', if the form has an update_row_context or update_rows_context hook, or if the value or the
+choices can't be used in a key, for example for a model choice field.
+"""
+from django.forms.models import ModelChoiceIterator
+from django.utils.translation import get_language
+
+from .caches import row_fragment_cache
+
+
+# The row depends on the form in other ways than the key
+UNSAFE_KEYS = frozenset(['form', 'bound_field'])
+
+
+def render(row):
+    """
+    Render a row, or get it from the cache
+    """
+    key = get_key(row)
+
+    if key is None:
+        return row._render()
+
+    base_key = key[0]
+
+    # Only the rows that can't be cached are stored by their base key
+    if base_key in row_fragment_cache:
+        return row._render()
+
+    html = row_fragment_cache.get(key)
+
+    if html is None:
+        html = render_and_store(row, base_key, key)
+
+    return html
+
+
+def get_key(row):
+    """
+    The key of the row html, as a tuple (base key, variant). Returns None if the row can't be cached.
+    """
+    form = row._form
+    bound_field = row._bound_field
+    field = bound_field.field
+    widget = field.widget
+
+    if form._has_row_context_hooks() or field.show_hidden_initial:
+        return None
+
+    choices = getattr(widget, 'choices', None)
+
+    if isinstance(choices, ModelChoiceIterator):
+        return None
+
+    value = bound_field.value()
+
+    if isinstance(value, list):
+        value = tuple(value)
+
+    base_key = (
+        type(form),
+        form.prefix,
+        form.auto_id,
+        bound_field.name,
+        row._get_template_name(),
+        getattr(form, 'template_engine', None),
+        form.use_fast_renderer,
+        form.required_css_class,
+        getattr(form, 'error_css_class', None),
+        form.errorlist_template,
+        form.label_template,
+        form.label_suffix,
+        form.use_required_attribute,
+        form.renderer,
+        get_language(),
+        bound_field.label,
+        field.label_suffix,
+        field.help_text,
+        field.required,
+        field.disabled,
+        type(widget),
+        tuple(sorted(widget.attrs.items())),
+        # Other state of the widget, for example the format of a DateInput
+        tuple(sorted((name, value) for (name, value) in vars(widget).items() if name not in ('attrs', 'choices'))),
+        row.must_render_label,
+    )
+    variant = (
+        value,
+        tuple(str(error) for error in bound_field.errors),
+        tuple(choices) if choices is not None else None,
+    )
+
+    try:
+        hash(base_key)
+        hash(variant)
+    except TypeError:
+        return None
+    else:
+        return (base_key, variant)
+
+
+def render_and_store(row, base_key, key):
+    """
+    Render the row as usual and record the values that the template uses. Store the html if the template uses only
+    values that are in the key.
+    """
+    from .pony_forms import LazyContext
+
+    used_keys = set()
+
+    def create_getter(context_key, getter):
+        def get_value(row):
+            used_keys.add(context_key)
+
+            return getter(row)
+
+        return get_value
+
+    row._context_value = LazyContext(
+        {context_key: create_getter(context_key, getter) for (context_key, getter) in row.context_getters.items()},
+        row
+    )
+
+    html = row._render()
+
+    if used_keys & UNSAFE_KEYS:
+        row_fragment_cache.set(base_key, False)
+    else:
+        row_fragment_cache.set(key, html)
+
+    return html
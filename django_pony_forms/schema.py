@@ -0,0 +1,117 @@
+"""
+Json schema of a form: the rows, labels, help texts, css classes, widgets, hidden fields and fieldsets that the
+templates render. For clients that render the form themselves.
+
+The schema doesn't depend on the data of the form. It's built for each form instance, because a form may change its
+labels, widgets and choices in __init__, and the ETag is the hash of its json; a client that has the same schema gets a
+304. The values and the errors of a form are in a separate, small payload.
+"""
+import hashlib
+import json
+from collections import namedtuple
+
+from django import forms
+from django.core.serializers.json import DjangoJSONEncoder
+from django.forms.models import ModelChoiceIterator
+from django.utils.encoding import force_str
+
+
+Schema = namedtuple('Schema', ['data', 'json', 'etag'])
+
+
+def get_schema(form):
+    """
+    Get the Schema of the form: the data as a dict, the data as json and the ETag
+    """
+    render_plan = form._render_plan
+
+    data = dict(
+        prefix=form.prefix,
+        rows=[get_row_schema(form.rows[field_name]) for field_name in render_plan.visible_field_names],
+        hidden_fields=[get_field_schema(form[field_name]) for field_name in render_plan.hidden_field_names],
+        fieldsets={key: list(field_names) for (key, field_names) in render_plan.fieldsets.items()},
+    )
+    json_data = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+
+    return Schema(data, json_data, hashlib.sha1(json_data.encode('utf-8')).hexdigest())
+
+
+def get_row_schema(row):
+    bound_field = row._bound_field
+    field = bound_field.field
+
+    result = get_field_schema(bound_field)
+    result.update(
+        label=row._get_label(),
+        help_text=row._get_help_text(),
+        required=field.required,
+        css_classes=row._form.required_css_class if field.required else '',
+        template=row._get_template_name(),
+        renders_label=not row.must_render_label,
+    )
+    return result
+
+
+def get_field_schema(bound_field):
+    widget = bound_field.field.widget
+
+    attrs = bound_field.build_widget_attrs(dict(widget.attrs), widget)
+
+    if bound_field.auto_id and 'id' not in attrs:
+        attrs['id'] = bound_field.auto_id
+
+    widget_schema = dict(
+        type=type(widget).__name__,
+        input_type=getattr(widget, 'input_type', None),
+        attrs=attrs,
+    )
+
+    choices = getattr(bound_field.field, 'choices', None)
+
+    # The choices of a queryset are data; they are not in the schema
+    if choices is not None and not isinstance(choices, ModelChoiceIterator):
+        widget_schema['choices'] = get_choices_schema(choices)
+
+    return dict(
+        name=bound_field.name,
+        html_name=bound_field.html_name,
+        widget=widget_schema,
+    )
+
+
+def get_choices_schema(choices):
+    result = []
+
+    for (value, label) in choices:
+        if isinstance(label, (list, tuple)):
+            # Group
+            result.append(dict(label=force_str(value), choices=get_choices_schema(label)))
+        else:
+            result.append(dict(value=value, label=force_str(label)))
+
+    return result
+
+
+def get_data(form):
+    """
+    The values and the errors of the form. The errors are empty for an unbound form.
+    """
+    return dict(
+        values={field_name: get_value(form[field_name]) for field_name in form._render_plan.field_names},
+        errors=form.errors.get_json_data() if form.is_bound else dict(),
+    )
+
+
+def get_value(bound_field):
+    """
+    The value of the field as the widget renders it. Files and passwords that the widget doesn't render are None.
+    """
+    field = bound_field.field
+    widget = field.widget
+
+    if isinstance(field, forms.FileField):
+        return None
+    elif isinstance(widget, forms.PasswordInput) and not widget.render_value:
+        return None
+    else:
+        return bound_field.value()
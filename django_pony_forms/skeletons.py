@@ -0,0 +1,152 @@
+"""
+Row skeletons: the html of a row template with holes for the values that change between renders.
+
+A skeleton is rendered once for each form class, field, row template and language, for each combination of empty and
+non-empty html values, and for each value of the text values. Later renders fill the holes instead of rendering the row
+template.
+
+The first render of each skeleton is compared with a normal render. A row is always rendered as usual if the html is
+different, if the row template uses 'form' or 'bound_field', or if the form has an update_row_context hook.
+"""
+import re
+
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
+
+from . import fast_renderer
+from .caches import skeleton_cache
+
+
+# Values that are html
+HTML_HOLES = frozenset(['label', 'field', 'errors'])
+
+# Values that are escaped
+TEXT_HOLES = frozenset(['html_name', 'id_for_label', 'css_classes'])
+
+HOLES = HTML_HOLES | TEXT_HOLES
+
+# Values that are the same for all rows with the same skeleton key
+STATIC_KEYS = frozenset(['label_title', 'name', 'help_text', 'must_render_label'])
+
+HOLE_PATTERN = re.compile('\x00django_pony_forms:hole:(\\w+)\x00')
+
+
+def get_marker(key):
+    return '\x00django_pony_forms:hole:{0!s}\x00'.format(key)
+
+
+def render(row):
+    """
+    Render a row with a skeleton. Returns None if the row must be rendered as usual.
+    """
+    base_key = get_base_key(row)
+    used_keys = skeleton_cache.get(base_key)
+
+    if used_keys is False:
+        return None
+    elif used_keys is not None:
+        parts = skeleton_cache.get((base_key, get_variant(row, used_keys)))
+
+        if parts is False:
+            return None
+        elif parts is not None:
+            return fill(row, parts)
+
+    return compile_skeleton(row, base_key, used_keys or frozenset())
+
+
+def get_base_key(row):
+    form = row._form
+    bound_field = row._bound_field
+
+    return (
+        type(form),
+        bound_field.name,
+        row._get_template_name(),
+        getattr(form, 'template_engine', None),
+        form.use_fast_renderer,
+        get_language(),
+        bound_field.label,
+        bound_field.field.help_text,
+        row.must_render_label,
+    )
+
+
+def get_variant(row, used_keys):
+    """
+    Which of the used html values are empty, and what are the used text values? Templates may test these, for example
+    {% if "error" in css_classes %}, so each combination has its own skeleton.
+    """
+    return tuple(sorted(
+        (key, row._context[key] if key in TEXT_HOLES else bool(row._context[key]))
+        for key in used_keys if key in HOLES
+    ))
+
+
+def compile_skeleton(row, base_key, known_keys):
+    """
+    Render the skeleton of the row, and render the row as usual. Store the skeleton if it gives the same html.
+    """
+    from .pony_forms import LazyContext
+
+    used_keys = set()
+
+    def create_getter(key):
+        def get_value(row):
+            used_keys.add(key)
+            value = row._context[key]
+
+            if key in HOLES and value:
+                return get_marker(key)
+            else:
+                return value
+
+        return get_value
+
+    skeleton_context = LazyContext({key: create_getter(key) for key in row.context_getters}, row)
+    skeleton_html = str(row._form._render_template(row._get_template_name(), skeleton_context))
+
+    html = row._form._render_template(row._get_template_name(), row._context)
+
+    if not used_keys <= (HOLES | STATIC_KEYS):
+        skeleton_cache.set(base_key, False)
+    else:
+        # Another combination of empty values may use other keys
+        used_keys = frozenset(known_keys | used_keys)
+        parts = tuple(HOLE_PATTERN.split(skeleton_html))
+
+        skeleton_cache.set(base_key, used_keys)
+
+        if fill(row, parts) == html:
+            skeleton_cache.set((base_key, get_variant(row, used_keys)), parts)
+        else:
+            skeleton_cache.set(base_key, False)
+
+    return mark_safe(html)
+
+
+def fill(row, parts):
+    """
+    Fill the holes of a skeleton. The parts alternate between html and hole names.
+    """
+    from .pony_forms import is_jinja2_template
+
+    if is_jinja2_template(row._get_template()):
+        # The Jinja2 templates use the 'safe' filter for html values
+        render_html = str
+        render_text = fast_renderer.render_jinja2_value
+    else:
+        render_html = fast_renderer.render_value
+        render_text = fast_renderer.render_value
+
+    result = []
+
+    for (i, part) in enumerate(parts):
+        if i % 2 == 0:
+            result.append(part)
+        elif part in HTML_HOLES:
+            result.append(render_html(row._context[part]))
+        else:
+            result.append(render_text(row._context[part]))
+
+    return mark_safe(u''.join(result))
@@ -0,0 +1,33 @@
+"""
+Helpers for tests.
+"""
+from . import queries
+
+
+def count_render_queries(renderable):
+    """
+    Render a form, formset or row and count the database queries. Returns the html and a QueryCounter.
+    """
+    with queries.count_queries() as counter:
+        html = str(renderable)
+
+    return (html, counter)
+
+
+class RenderQueriesTestMixin:
+    """
+    Mixin for a TestCase:
+
+        self.assertNumRenderQueries(1, form)
+    """
+    def assertNumRenderQueries(self, number, renderable):
+        (html, counter) = count_render_queries(renderable)
+
+        if counter.count != number:
+            self.fail(
+                '{0:d} queries while rendering, expected {1:d}. Queries by row: {2!s}'.format(
+                    counter.count, number, counter.format_counts()
+                )
+            )
+
+        return html
@@ -0,0 +1,87 @@
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+
+class LiveValidationMixin:
+    """
+    Mixin for a FormView with a pony form. Validates and renders a single row or fieldset for live validation.
+
+    A POST with 'pony_forms_row' (a field name) or 'pony_forms_fieldset' (a fieldset key) validates only those fields
+    and returns json with the html and the errors:
+
+        {"html": "...", "errors": {"name": [{"message": "This field is required.", "code": "required"}]}}
+
+    The clean method of the form is not called. Other POST requests are handled by the view as usual.
+    """
+    row_parameter = 'pony_forms_row'
+    fieldset_parameter = 'pony_forms_fieldset'
+
+    def post(self, request, *args, **kwargs):
+        field_name = request.POST.get(self.row_parameter)
+        fieldset_key = request.POST.get(self.fieldset_parameter)
+
+        if field_name is None and fieldset_key is None:
+            return super(LiveValidationMixin, self).post(request, *args, **kwargs)
+
+        form = self.get_form()
+
+        if field_name is not None:
+            if field_name not in form.fields:
+                return JsonResponse(dict(error='Unknown row'), status=400)
+
+            html = form.render_row(field_name)
+        else:
+            if fieldset_key not in form._render_plan.fieldsets:
+                return JsonResponse(dict(error='Unknown fieldset'), status=400)
+
+            html = form.render_fieldset(fieldset_key)
+
+        return JsonResponse(
+            dict(
+                html=str(html),
+                errors=form.partial_errors.get_json_data(),
+            )
+        )
+
+
+class FormSchemaMixin:
+    """
+    Mixin for a FormView with a pony form. Serves the json schema and the data of the form, for clients that render
+    the form themselves.
+
+    A GET with 'pony_forms_schema' returns the schema with an ETag; if the client has the same schema, then the
+    response is a 304. A GET or a POST with 'pony_forms_data' returns the values and the errors of the form:
+
+        {"values": {"name": ""}, "errors": {"name": [{"message": "This field is required.", "code": "required"}]}}
+
+    Other requests are handled by the view as usual.
+    """
+    schema_parameter = 'pony_forms_schema'
+    data_parameter = 'pony_forms_data'
+
+    def get(self, request, *args, **kwargs):
+        if self.schema_parameter in request.GET:
+            return self.get_schema_response(self.get_form())
+        elif self.data_parameter in request.GET:
+            return JsonResponse(self.get_form().get_data_payload())
+        else:
+            return super(FormSchemaMixin, self).get(request, *args, **kwargs)
+
+    def post(self, request, *args, **kwargs):
+        if self.data_parameter in request.POST:
+            return JsonResponse(self.get_form().get_data_payload())
+        else:
+            return super(FormSchemaMixin, self).post(request, *args, **kwargs)
+
+    def get_schema_response(self, form):
+        schema = form.get_schema()
+        etag = quote_etag(schema.etag)
+
+        response = get_conditional_response(self.request, etag=etag)
+
+        if response is None:
+            response = HttpResponse(schema.json, content_type='application/json')
+
+        response['ETag'] = etag
+        return response
@@ -0,0 +1,104 @@
+"""
+Load the templates and build the render plans of forms before the first request.
+
+Settings:
+
+- PONY_FORMS_PRELOAD: warm up when Django starts (in AppConfig.ready). With a pre-fork server that loads the
+  application before forking (for example 'gunicorn --preload'), the workers share the warm caches.
+- PONY_FORMS_WARMUP_FORMS: dotted paths of form classes to warm up. The 'forms' modules of the installed apps are
+  also imported; all subclasses of PonyFormMixin are warmed up.
+"""
+import logging
+from collections import namedtuple
+from time import perf_counter
+
+from django.conf import settings
+from django.utils.module_loading import autodiscover_modules, import_string
+
+from .pony_forms import form_classes, get_cached_template, get_template_variables
+
+
+logger = logging.getLogger(__name__)
+
+WarmupResult = namedtuple('WarmupResult', ['form_class', 'duration', 'template_names', 'error'])
+
+
+def discover_form_classes(form_paths=None):
+    """
+    Get the form classes to warm up: the configured forms and all imported subclasses of PonyFormMixin.
+    """
+    if form_paths is None:
+        form_paths = getattr(settings, 'PONY_FORMS_WARMUP_FORMS', [])
+
+    configured_classes = [import_string(path) for path in form_paths]
+
+    autodiscover_modules('forms')
+
+    discovered_classes = sorted(
+        (
+            form_class for form_class in list(form_classes)
+            if hasattr(form_class, 'base_fields') and form_class not in configured_classes
+        ),
+        key=lambda form_class: (form_class.__module__, form_class.__qualname__)
+    )
+
+    return configured_classes + discovered_classes
+
+
+def get_template_names(form_class):
+    template_names = [
+        form_class.form_template,
+        form_class.row_template,
+        form_class.errorlist_template,
+        form_class.label_template,
+    ]
+    template_names.extend(form_class.custom_row_templates.values())
+
+    if form_class.fieldset_template is not None:
+        template_names.append(form_class.fieldset_template)
+
+    # Without duplicates, in order
+    return list(dict.fromkeys(template_names))
+
+
+def warm_up_form_class(form_class):
+    """
+    Load the templates of the form class and build its render plan. The form is created without arguments; if that
+    fails, then only the templates are loaded.
+    """
+    start = perf_counter()
+    template_names = get_template_names(form_class)
+    template_engine = getattr(form_class, 'template_engine', None)
+    error = None
+
+    try:
+        for template_name in template_names:
+            get_template_variables(get_cached_template(template_engine, template_name))
+
+        try:
+            form = form_class()
+        except TypeError:
+            # The form has required arguments
+            pass
+        else:
+            form._render_plan
+    except Exception as e:
+        error = e
+
+    return WarmupResult(form_class, perf_counter() - start, template_names, error)
+
+
+def warm_up(form_paths=None):
+    """
+    Warm up all forms. Returns a list of WarmupResult.
+    """
+    results = [warm_up_form_class(form_class) for form_class in discover_form_classes(form_paths)]
+
+    for result in results:
+        if result.error is not None:
+            logger.warning(
+                'Warm up of %s.%s failed: %r',
+                result.form_class.__module__, result.form_class.__qualname__, result.error
+            )
+
+    return results
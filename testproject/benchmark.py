@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+"""
+Benchmark for rendering pony forms.
+
+Renders synthetic forms with 10, 100 and 1000 fields on the Django and the Jinja2 template backends, and the
+'as_div' method of Django (or 'as_p' for Django versions without 'as_div') as a baseline.
+
+Usage:
+
+    python benchmark.py [--output benchmark_results.json] [--min-time 0.2] [--sizes 10 100 1000]
+
+The results are written as json, so they can be compared between commits.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+
+base_dir = os.path.abspath(os.path.dirname(__file__))
+
+sys.path[0:0] = [base_dir, os.path.join(base_dir, '..')]
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+# Production-like settings: no debug, so the templates are cached
+settings.configure(
+    DEBUG=False,
+    INSTALLED_APPS=['django_pony_forms', 'testapp'],
+    TEMPLATES=[
+        dict(
+            BACKEND='django.template.backends.django.DjangoTemplates',
+            APP_DIRS=True,
+        ),
+        dict(
+            BACKEND='django.template.backends.jinja2.Jinja2',
+            APP_DIRS=True,
+            OPTIONS=dict(environment='django_pony_forms.jinja2_environment.environment'),
+        ),
+    ],
+)
+django.setup()
+
+from django import forms  # noqa: E402
+
+from django_pony_forms.pony_forms import PonyFormMixin  # noqa: E402
+
+
+VARIANTS = ['plain', 'errors', 'hidden', 'fieldsets', 'custom_row_templates']
+
+BACKENDS = dict(
+    django=dict(template_engine='django'),
+    django_fast=dict(template_engine='django', use_fast_renderer=True),
+    django_skeletons=dict(template_engine='django', use_row_skeletons=True),
+    jinja2=dict(template_engine='jinja2'),
+)
+
+
+def create_form_class(field_count, variant, backend):
+    attrs = dict()
+
+    for i in range(field_count):
+        widget = forms.HiddenInput if variant == 'hidden' and i % 5 == 0 else forms.TextInput
+
+        attrs['field{0:d}'.format(i)] = forms.CharField(
+            max_length=50,
+            help_text='Help text for field {0:d}'.format(i),
+            widget=widget
+        )
+
+    if variant == 'fieldsets':
+        attrs['fieldset_definitions'] = {
+            'fieldset{0:d}'.format(i // 10): ['field{0:d}'.format(j) for j in range(i, min(i + 10, field_count))]
+            for i in range(0, field_count, 10)
+        }
+
+    if variant == 'custom_row_templates':
+        attrs['custom_row_templates'] = {
+            'field{0:d}'.format(i): 'field_only_row.html' for i in range(0, field_count, 2)
+        }
+
+    if backend == 'baseline':
+        bases = (forms.Form,)
+    else:
+        attrs.update(BACKENDS[backend])
+        bases = (PonyFormMixin, forms.Form)
+
+    return type('BenchmarkForm{0:d}'.format(field_count), bases, attrs)
+
+
+def create_render_function(form_class, variant, backend):
+    data = dict() if variant == 'errors' else None
+
+    if backend == 'baseline':
+        method_name = 'as_div' if hasattr(form_class, 'as_div') else 'as_p'
+
+        return lambda: getattr(form_class(data), method_name)()
+    elif variant == 'fieldsets':
+        def render():
+            form = form_class(data)
+
+            return u''.join(
+                str(form.fieldsets[key]) for key in form_class.fieldset_definitions
+            )
+
+        return render
+    else:
+        return lambda: str(form_class(data))
+
+
+def measure(render, field_count, min_time):
+    # Warm up: load the templates and build the caches
+    render()
+
+    count = 0
+    start = time.perf_counter()
+    elapsed = 0
+
+    while count < 3 or elapsed < min_time:
+        render()
+        count += 1
+        elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        render()
+        peak_allocated = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    seconds_per_render = elapsed / count
+
+    return dict(
+        renders=count,
+        renders_per_second=1 / seconds_per_render,
+        microseconds_per_row=seconds_per_render / field_count * 1000000,
+        peak_allocated_bytes=peak_allocated,
+    )
+
+
+def get_git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL
+        ).decode('ascii').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, min_time):
+    results = []
+
+    for field_count in sizes:
+        for backend in list(BACKENDS.keys()) + ['baseline']:
+            for variant in VARIANTS:
+                if backend == 'baseline' and variant not in ('plain', 'errors', 'hidden'):
+                    continue
+
+                form_class = create_form_class(field_count, variant, backend)
+                result = dict(
+                    fields=field_count,
+                    backend=backend,
+                    variant=variant,
+                    **measure(create_render_function(form_class, variant, backend), field_count, min_time)
+                )
+                results.append(result)
+
+                print(
+                    '{fields:>5d} {backend:<16s} {variant:<21s} {renders_per_second:>10.1f} renders/s '
+                    '{microseconds_per_row:>8.2f} us/row {peak_allocated_bytes:>10d} bytes'.format(**result)
+                )
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark for rendering pony forms')
+    parser.add_argument('--output', default='benchmark_results.json', help='Json file for the results')
+    parser.add_argument('--min-time', type=float, default=0.2, help='Minimum time in seconds for each benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000], help='Number of fields')
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.min_time)
+
+    with open(args.output, 'w') as f:
+        json.dump(
+            dict(
+                git_revision=get_git_revision(),
+                python=platform.python_version(),
+                django=django.get_version(),
+                results=results,
+            ),
+            f,
+            indent=2
+        )
+
+    print('Results are written to {0!s}'.format(args.output))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -115,6 +115,13 @@ TEMPLATES = [
     ),
     dict(
         BACKEND='django.template.backends.jinja2.Jinja2',
-        APP_DIRS=True
+        APP_DIRS=True,
+        OPTIONS=dict(environment='django_pony_forms.jinja2_environment.environment')
+    ),
+    dict(
+        BACKEND='django.template.backends.jinja2.Jinja2',
+        NAME='jinja2_async',
+        APP_DIRS=True,
+        OPTIONS=dict(enable_async=True)
     )
 ]
@@ -2,7 +2,7 @@ from django import forms
 from django.core.exceptions import ValidationError
 from django.utils.safestring import mark_safe
 
-from django_pony_forms.pony_forms import PonyFormMixin
+from django_pony_forms.pony_forms import PonyFormMixin, PonyFormSetMixin
 
 
 class ExampleTextarea(forms.Textarea):
@@ -25,7 +25,7 @@ class ExampleForm(PonyFormMixin, forms.Form):
 
     fieldset_definitions = dict(
         f1=['name'],
-        f2=['type', 'description']
+        f2=['example_type', 'description']
     )
 
     row_template = 'foundation_row.html'
@@ -38,3 +38,11 @@ class ExampleForm(PonyFormMixin, forms.Form):
         return dict(
             widget_name=bound_field.field.widget.__class__.__name__
         )
+
+
+class BaseExampleFormSet(PonyFormSetMixin, forms.BaseFormSet):
+    def clean(self):
+        raise ValidationError('Formset message')
+
+
+ExampleFormSet = forms.formset_factory(ExampleForm, formset=BaseExampleFormSet, extra=2)
@@ -1,12 +1,48 @@
+import asyncio
+import datetime
+import gc
+import json
+import os
+import tempfile
+import tracemalloc
 import unittest
+import weakref
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
+import django
+import jinja2
 from pyquery import PyQuery as pq
 
 from django import forms
-from django.test import Client
+from django.apps import apps
+from django.contrib.auth.models import Group
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import TemplateDoesNotExist
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.utils import translation
+from django.utils.autoreload import autoreload_started, file_changed
+from django.utils.safestring import mark_safe
+from django.utils.translation import gettext_lazy
 
-from .forms import ExampleForm
+from django_pony_forms import (
+    cached_options, checks, fast_renderer, instrumentation, jinja2_environment, queries, row_fragments, warmup
+)
+from django_pony_forms.caches import (
+    fragment_cache, label_cache, option_cache, render_plan_cache, row_fragment_cache, skeleton_cache,
+    template_cache
+)
+from django_pony_forms.panels import PonyFormsPanel
+from django_pony_forms.pony_forms import PonyFormMixin, get_cached_template
+from django_pony_forms.testing import RenderQueriesTestMixin, count_render_queries
+
+from .forms import BaseExampleFormSet, ExampleForm, ExampleFormSet
 from .test_utils import format_list
+from .views import Index
 
 
 class PonyFormTest(unittest.TestCase):
@@ -157,3 +193,1503 @@ class PonyFormTest(unittest.TestCase):
 
         name_field = d('#id_example-name')
         self.assertEqual(name_field.attr('name'), 'example-name')
+
+
+class TemplateCacheTest(unittest.TestCase):
+    def setUp(self):
+        template_cache.clear()
+
+    def test_templates_are_shared_between_forms(self):
+        str(ExampleForm())
+        misses = template_cache.info().misses
+
+        str(ExampleForm())
+        info = template_cache.info()
+
+        self.assertEqual(info.misses, misses)
+        self.assertTrue(info.hits > 0)
+        self.assertTrue(
+            (None, ExampleForm.row_template) in template_cache
+        )
+
+    def test_form_is_not_kept_alive(self):
+        form = ExampleForm(dict())
+        str(form)
+
+        form_ref = weakref.ref(form)
+        del form
+        gc.collect()
+
+        self.assertIsNone(form_ref())
+
+    def test_autoreload(self):
+        template_directory = Path(__file__).resolve().parent / 'templates'
+
+        reloader = mock.Mock()
+        autoreload_started.send(sender=reloader)
+        self.assertIn(mock.call(template_directory, '**/*'), reloader.watch_dir.call_args_list)
+
+        str(ExampleForm())
+        self.assertTrue(len(template_cache) > 0)
+
+        # A changed template clears the caches, without a reload
+        results = file_changed.send(sender=reloader, file_path=template_directory / 'foundation_row.html')
+
+        self.assertEqual(len(template_cache), 0)
+        self.assertIn(True, [result for (_, result) in results])
+
+        # Other files still reload the code
+        results = file_changed.send(sender=reloader, file_path=Path(__file__).resolve())
+        self.assertNotIn(True, [result for (_, result) in results])
+
+    def test_eviction(self):
+        template_cache.maxsize = 1
+
+        try:
+            str(ExampleForm())
+            self.assertEqual(len(template_cache), 1)
+        finally:
+            template_cache.maxsize = 256
+
+
+class RenderPlanTest(unittest.TestCase):
+    def test_plan_is_shared(self):
+        plan = ExampleForm()._render_plan
+
+        self.assertIs(ExampleForm(dict())._render_plan, plan)
+        self.assertEqual(plan.hidden_field_names, ('code',))
+        self.assertEqual(plan.visible_field_names, ('name', 'description', 'example_type'))
+        self.assertEqual(plan.row_templates['name'], 'foundation_row.html')
+        self.assertEqual(plan.own_label_field_names, frozenset(['description']))
+        self.assertEqual(plan.fieldsets['f2'], ('example_type', 'description'))
+        self.assertEqual(plan.fieldset_index['description'], ('f2',))
+
+    def test_changed_fields(self):
+        class FormWithExtraField(ExampleForm):
+            def __init__(self, *args, **kwargs):
+                super(FormWithExtraField, self).__init__(*args, **kwargs)
+
+                self.fields['extra'] = forms.CharField()
+                self.fields['name'].widget = forms.HiddenInput()
+
+        plan = FormWithExtraField()._render_plan
+
+        self.assertIsNot(plan, ExampleForm()._render_plan)
+        self.assertEqual(plan.hidden_field_names, ('name', 'code'))
+        self.assertEqual(plan.visible_field_names, ('description', 'example_type', 'extra'))
+        self.assertEqual(plan.fieldsets['f1'], ())
+
+    def test_changed_row_templates_and_fieldsets(self):
+        class InstanceForm(PonyFormMixin, forms.Form):
+            a = forms.CharField()
+            b = forms.CharField()
+
+            fieldset_definitions = dict(first=['a', 'b'])
+
+            def __init__(self, *args, only_b=False, **kwargs):
+                super(InstanceForm, self).__init__(*args, **kwargs)
+
+                if only_b:
+                    self.fieldset_definitions = dict(first=['b'])
+                    self.custom_row_templates = dict(b='field_only_row.html')
+
+        plan = InstanceForm()._render_plan
+        other_plan = InstanceForm(only_b=True)._render_plan
+
+        self.assertEqual(plan.fieldsets['first'], ('a', 'b'))
+        self.assertEqual(plan.row_templates['b'], 'django_pony_forms/row.html')
+        self.assertEqual(other_plan.fieldsets['first'], ('b',))
+        self.assertEqual(other_plan.row_templates['b'], 'field_only_row.html')
+        self.assertIs(InstanceForm(only_b=True)._render_plan, other_plan)
+
+
+class IterRenderTest(unittest.TestCase):
+    def test_iter_render(self):
+        for data in [None, dict()]:
+            chunks = list(ExampleForm(data).iter_render())
+
+            self.assertEqual(u''.join(chunks), str(ExampleForm(data)))
+            # Hidden fields and top errors, three rows, rest of the form template
+            self.assertEqual(len(chunks), 5)
+
+    def test_iter_render_fieldset(self):
+        form = ExampleForm()
+
+        self.assertEqual(
+            u''.join(form.fieldsets['f1'].iter_render()),
+            str(form.fieldsets['f1'])
+        )
+
+
+@unittest.skipIf(django.VERSION < (3, 0), 'asgiref comes with Django 3.0')
+class AsyncRenderTest(unittest.TestCase):
+    def test_arender(self):
+        for data in [None, dict()]:
+            self.assertEqual(
+                asyncio.run(ExampleForm(data).arender()),
+                str(ExampleForm(data))
+            )
+
+    def test_arender_jinja2_async(self):
+        class Jinja2Form(ExampleForm):
+            template_engine = 'jinja2'
+
+        class Jinja2AsyncForm(ExampleForm):
+            template_engine = 'jinja2_async'
+
+        for data in [None, dict()]:
+            self.assertEqual(
+                asyncio.run(Jinja2AsyncForm(data).arender()),
+                str(Jinja2Form(data))
+            )
+
+    def test_arender_row_and_errors(self):
+        form = ExampleForm(dict())
+        expected_row = str(form.rows['name'])
+        expected_errors = str(form.top_errors)
+
+        form = ExampleForm(dict())
+        self.assertEqual(asyncio.run(form.rows['name'].arender()), expected_row)
+        self.assertEqual(asyncio.run(form.top_errors.arender()), expected_errors)
+
+
+class FragmentCacheTest(unittest.TestCase):
+    class UncachedForm(PonyFormMixin, forms.Form):
+        prefix = 'example'
+
+        name = forms.CharField(max_length=50, help_text='help text')
+        description = forms.CharField(required=False, widget=forms.Textarea)
+        code = forms.CharField(widget=forms.HiddenInput)
+        example_type = forms.ChoiceField(choices=[(1, 'abc'), (2, 'def')])
+
+    class CachedForm(UncachedForm):
+        use_fragment_cache = True
+
+    def setUp(self):
+        fragment_cache.clear_stats()
+
+    def test_unbound_form(self):
+        # The form and the three rows
+        html = str(self.CachedForm(initial=dict(name='fragment-cache-test')))
+        self.assertEqual(fragment_cache.info().misses, 4)
+
+        self.assertEqual(str(self.CachedForm(initial=dict(name='fragment-cache-test'))), html)
+        self.assertEqual(fragment_cache.info().hits, 1)
+
+        self.assertEqual(html, str(self.UncachedForm(initial=dict(name='fragment-cache-test'))))
+
+        # Other initial values
+        str(self.CachedForm(initial=dict(name='other')))
+        self.assertEqual(fragment_cache.info().misses, 8)
+
+        # Other language
+        with translation.override('nl'):
+            str(self.CachedForm(initial=dict(name='fragment-cache-test')))
+        self.assertEqual(fragment_cache.info().misses, 12)
+
+    def test_row(self):
+        form = self.CachedForm(initial=dict(name='fragment-cache-row-test'))
+        html = str(form.rows['name'])
+
+        self.assertEqual(str(self.CachedForm(initial=dict(name='fragment-cache-row-test')).rows['name']), html)
+        self.assertEqual(fragment_cache.info(), (1, 1, None, None))
+
+    def test_form_options(self):
+        form = self.CachedForm(initial=dict(name='fragment-cache-options-test'))
+        key = form._fragment_cache_key
+
+        self.assertEqual(len(pq(u'<div>{0!s}</div>'.format(form))('[required]')), 1)
+
+        form = self.CachedForm(initial=dict(name='fragment-cache-options-test'), use_required_attribute=False)
+        self.assertNotEqual(form._fragment_cache_key, key)
+        self.assertEqual(len(pq(u'<div>{0!s}</div>'.format(form))('[required]')), 0)
+
+        options = [('use_fast_renderer', True), ('fieldset_template', 'django_pony_forms/fieldset.html')]
+
+        for (attribute, value) in options:
+            form = self.CachedForm(initial=dict(name='fragment-cache-options-test'))
+            setattr(form, attribute, value)
+
+            self.assertNotEqual(form._fragment_cache_key, key)
+
+    def test_bypass(self):
+        str(self.CachedForm(dict()))
+        str(self.UncachedForm())
+
+        class HookForm(self.CachedForm):
+            def update_row_context(self, bound_field):
+                return dict()
+
+        str(HookForm())
+
+        class UserGroupForm(self.CachedForm):
+            group = forms.ModelChoiceField(queryset=Group.objects.none())
+
+        class CallableChoicesForm(self.CachedForm):
+            example_type = forms.ChoiceField(choices=lambda: [(1, 'abc')])
+
+        for form_class in [UserGroupForm, CallableChoicesForm]:
+            self.assertIsNone(form_class()._fragment_cache_key)
+
+        self.assertEqual(fragment_cache.info(), (0, 0, None, None))
+
+
+class FastRendererTest(unittest.TestCase):
+    class DefaultTemplatesForm(ExampleForm):
+        row_template = 'django_pony_forms/row.html'
+        errorlist_template = 'django_pony_forms/errorlist.html'
+
+        special = forms.CharField(label='<Special> & more', help_text="it's <b>bold</b>", required=False)
+
+        def clean_special(self):
+            raise forms.ValidationError('Invalid <value> & "more"')
+
+    class Jinja2Form(ExampleForm):
+        template_engine = 'jinja2'
+
+    class Jinja2DefaultTemplatesForm(DefaultTemplatesForm):
+        template_engine = 'jinja2'
+
+    def assert_same_html(self, form_class, *args, **kwargs):
+        class FastForm(form_class):
+            use_fast_renderer = True
+
+        self.assertEqual(
+            str(FastForm(*args, **kwargs)),
+            str(form_class(*args, **kwargs))
+        )
+
+    def test_django(self):
+        self.assert_same_html(self.DefaultTemplatesForm)
+        self.assert_same_html(self.DefaultTemplatesForm, dict(special='x'))
+        self.assert_same_html(self.DefaultTemplatesForm, auto_id=False)
+
+    def test_jinja2(self):
+        self.assert_same_html(self.Jinja2Form)
+        self.assert_same_html(self.Jinja2Form, dict())
+        self.assert_same_html(self.Jinja2DefaultTemplatesForm)
+        self.assert_same_html(self.Jinja2DefaultTemplatesForm, dict(special='x'))
+        self.assert_same_html(self.Jinja2DefaultTemplatesForm, auto_id=False)
+
+    def test_empty_label(self):
+        form = self.DefaultTemplatesForm()
+        form.fields['name'].label = ''
+
+        fast_form = self.DefaultTemplatesForm()
+        fast_form.use_fast_renderer = True
+        fast_form.fields['name'].label = ''
+
+        self.assertEqual(str(fast_form), str(form))
+
+    def test_custom_template(self):
+        form = ExampleForm()
+        form.use_fast_renderer = True
+
+        template = form._get_template_by_name(form.row_template)
+        self.assertIsNone(fast_renderer.get_render_function(template))
+
+        template = form._get_template_by_name(form.label_template)
+        self.assertIs(fast_renderer.get_render_function(template), fast_renderer.render_label)
+
+
+class FormSetTest(unittest.TestCase):
+    def test_html(self):
+        formset = ExampleFormSet()
+        d = pq(u"<div>{0!s}</div>".format(str(formset)))
+
+        self.assertEqual(
+            format_list(pq(e).attr('name') for e in d('input[type=hidden]')),
+            'form-0-code form-1-code form-INITIAL_FORMS form-MAX_NUM_FORMS form-MIN_NUM_FORMS form-TOTAL_FORMS'
+        )
+        self.assertEqual(
+            format_list(
+                [pq(row).attr('id') for row in d('div.form-row')],
+                sort=False
+            ),
+            'row-form-0-name row-form-0-description row-form-0-example_type '
+            'row-form-1-name row-form-1-description row-form-1-example_type'
+        )
+
+    def test_properties(self):
+        formset = ExampleFormSet()
+
+        self.assertEqual(
+            format_list(formset.hidden_fields.keys()),
+            'INITIAL_FORMS MAX_NUM_FORMS MIN_NUM_FORMS TOTAL_FORMS'
+        )
+        self.assertEqual(len(formset.rows), 2)
+        self.assertEqual(format_list(formset.rows[1].keys(), sort=False), 'name description example_type')
+        self.assertEqual(len(formset.top_errors), 0)
+
+    def test_non_form_errors(self):
+        formset = ExampleFormSet({'form-TOTAL_FORMS': '1', 'form-INITIAL_FORMS': '0'})
+
+        self.assertEqual(list(formset.top_errors), ['Formset message'])
+        self.assertTrue('Formset message' in str(formset))
+
+
+class LazyRowContextTest(unittest.TestCase):
+    class FieldOnlyForm(ExampleForm):
+        row_template = 'field_only_row.html'
+
+        def update_row_context(self, bound_field):
+            return dict()
+
+    class Jinja2FieldOnlyForm(FieldOnlyForm):
+        template_engine = 'jinja2'
+
+    def test_only_used_values_are_computed(self):
+        for form_class in [self.FieldOnlyForm, self.Jinja2FieldOnlyForm]:
+            form = form_class({'example-name': 'abc'})
+            row = form.rows['name']
+
+            d = pq(str(row))
+            self.assertEqual(d.attr('class'), 'field-only')
+            self.assertEqual(d('input').attr('value'), 'abc')
+
+            self.assertIsNone(row._label_tag_value)
+            self.assertIsNone(row._errorlist)
+            self.assertIsNone(form._errors)
+
+    def test_context(self):
+        row = ExampleForm().rows['name']
+        context = row._context
+
+        self.assertEqual(context['name'], 'name')
+        self.assertEqual(context['widget_name'], 'TextInput')
+        self.assertTrue('css_classes' in context)
+        self.assertFalse('unknown' in context)
+        self.assertEqual(
+            set(context.keys()),
+            set(row.context_getters.keys()) | set(['widget_name'])
+        )
+
+
+class LazyFormContextTest(unittest.TestCase):
+    def test_no_validation(self):
+        form = ExampleForm(dict())
+
+        self.assertEqual(list(form.rows.keys()), ['name', 'description', 'example_type'])
+        self.assertEqual(list(form.hidden_fields.keys()), ['code'])
+        self.assertEqual(list(form.fieldsets['f1'].keys()), ['name'])
+        self.assertIsNone(form._errors)
+
+        self.assertEqual(len(form.top_errors), 2)
+        self.assertIsNotNone(form._errors)
+
+    def test_only_used_sections_are_computed(self):
+        form = ExampleForm()
+        form.rows
+
+        self.assertEqual(dict.keys(form._form_context_dict), set(['rows']))
+
+    def test_formset(self):
+        formset = ExampleFormSet(
+            {'form-TOTAL_FORMS': '1', 'form-INITIAL_FORMS': '0', 'example-name': 'abc'}
+        )
+
+        self.assertEqual(len(formset.rows), 1)
+        self.assertIsNone(formset._errors)
+
+        self.assertEqual(list(formset.top_errors), ['Formset message'])
+
+
+class CompactContextTest(unittest.TestCase):
+    def test_shared_bound_fields(self):
+        form = ExampleForm()
+
+        self.assertIs(form.rows['name']._bound_field, form['name'])
+        self.assertIs(form.hidden_fields['code'], form['code'])
+
+    def test_allocations(self):
+        field_count = 500
+        LargeForm = type(
+            'LargeForm',
+            (PonyFormMixin, forms.Form),
+            {'field{0:d}'.format(i): forms.CharField() for i in range(field_count)}
+        )
+
+        form = LargeForm()
+        form._render_plan
+
+        for field_name in form.fields:
+            form[field_name]
+
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            rows = form.rows
+            after = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(len(rows), field_count)
+        self.assertFalse(hasattr(rows['field0'], '__dict__'))
+
+        # A row must not allocate another bound field
+        self.assertLess((after - before) / field_count, 300)
+
+
+class InstrumentationTest(unittest.TestCase):
+    def test_events(self):
+        self.assertFalse(instrumentation.enabled)
+
+        events = []
+        instrumentation.add_listener(events.append)
+        try:
+            self.assertTrue(instrumentation.enabled)
+
+            form = ExampleForm(dict())
+            str(form)
+        finally:
+            instrumentation.remove_listener(events.append)
+
+        self.assertFalse(instrumentation.enabled)
+        self.assertEqual(
+            set(event.phase for event in events),
+            set(['form', 'row', 'widget', 'errorlist', 'update_row_context', 'template_lookup'])
+        )
+
+        summary = instrumentation.summarize(events)
+        self.assertEqual(len(summary), 1)
+
+        form_summary = summary[0]
+        self.assertTrue(form_summary['form_class'].endswith('testapp.forms.ExampleForm'))
+        self.assertTrue(form_summary['duration'] > 0)
+        self.assertEqual(form_summary['templates_rendered'], 8)
+        self.assertEqual(
+            form_summary['template_cache_hits'] + form_summary['template_cache_misses'],
+            len([event for event in events if event.phase == 'template_lookup'])
+        )
+        self.assertEqual(
+            format_list([row['name'] for row in form_summary['rows']], sort=False),
+            'name description example_type'
+        )
+
+    def test_no_events_without_listener(self):
+        events = []
+        instrumentation.add_listener(events.append)
+        instrumentation.remove_listener(events.append)
+
+        str(ExampleForm())
+        self.assertEqual(events, [])
+
+
+class PanelTest(unittest.TestCase):
+    def test_panel(self):
+        toolbar = mock.Mock(stats=dict())
+        panel = PonyFormsPanel(toolbar, mock.Mock())
+
+        panel.enable_instrumentation()
+        try:
+            str(ExampleForm(dict()))
+        finally:
+            panel.disable_instrumentation()
+
+        self.assertFalse(instrumentation.enabled)
+
+        panel.generate_stats(mock.Mock(), mock.Mock())
+        forms = panel.get_stats()['forms']
+
+        self.assertEqual(len(forms), 1)
+        self.assertEqual([row['name'] for row in forms[0]['rows']], ['name', 'description', 'example_type'])
+        self.assertTrue(forms[0]['duration'] > 0)
+        self.assertRegex(panel.nav_subtitle, r'^1 forms in \d+\.\d ms$')
+
+
+class Jinja2TemplatesTest(unittest.TestCase):
+    class DjangoForm(ExampleForm):
+        row_template = 'django_pony_forms/row.html'
+        errorlist_template = 'django_pony_forms/errorlist.html'
+
+        special = forms.CharField(label='<Special> & more', help_text='<b>bold</b>', required=False)
+
+    class Jinja2Form(DjangoForm):
+        template_engine = 'jinja2'
+
+    def test_same_html(self):
+        for args in [(), (dict(),), (dict(special='x'),)]:
+            self.assertEqual(str(self.Jinja2Form(*args)), str(self.DjangoForm(*args)))
+
+        self.assertEqual(
+            str(self.Jinja2Form(auto_id=False)),
+            str(self.DjangoForm(auto_id=False))
+        )
+
+    def test_formset(self):
+        class DjangoFormSet(BaseExampleFormSet):
+            pass
+
+        class Jinja2FormSet(BaseExampleFormSet):
+            template_engine = 'jinja2'
+
+        self.assertEqual(
+            str(forms.formset_factory(self.Jinja2Form, formset=Jinja2FormSet)()),
+            str(forms.formset_factory(self.Jinja2Form, formset=DjangoFormSet)())
+        )
+
+    def test_bytecode_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(PONY_FORMS_JINJA2_BYTECODE_CACHE_DIR=directory):
+                environment = jinja2_environment.environment(loader=jinja2.DictLoader(dict(a='{{ a }}')))
+                environment.get_template('a')
+                self.assertEqual(len(os.listdir(directory)), 1)
+
+                # Another environment, for example in a new process, uses the bytecode
+                environment = jinja2_environment.environment(loader=jinja2.DictLoader(dict(a='{{ a }}')))
+
+                with mock.patch.object(environment, 'compile', side_effect=AssertionError) as compile:
+                    self.assertEqual(environment.get_template('a').render(a=1), '1')
+
+                self.assertEqual(compile.call_count, 0)
+
+    def test_default_bytecode_cache(self):
+        environment = jinja2_environment.environment()
+        self.assertIsInstance(environment.bytecode_cache, jinja2.FileSystemBytecodeCache)
+
+
+class PartialRenderTest(unittest.TestCase):
+    class CleanNameForm(ExampleForm):
+        def clean_name(self):
+            return self.cleaned_data['name'].upper()
+
+    def test_render_row(self):
+        form = self.CleanNameForm({'example-description': 'abc'})
+        html = form.render_row('name')
+
+        self.assertEqual(pq(html)('.alert').text(), 'This field is required.')
+
+        # Only the name is validated; form.clean is not called
+        self.assertEqual(list(form.partial_errors.keys()), ['name'])
+        self.assertEqual(form.partial_cleaned_data, dict())
+
+    def test_clean_field_method(self):
+        form = self.CleanNameForm({'example-name': 'abc'})
+        form.render_row('name')
+
+        self.assertEqual(form.partial_errors, dict())
+        self.assertEqual(form.partial_cleaned_data, dict(name='ABC'))
+
+    def test_form_is_not_validated(self):
+        class RequiredForm(PonyFormMixin, forms.Form):
+            a = forms.CharField()
+            b = forms.CharField()
+
+        form = RequiredForm(dict(a='x'))
+        self.assertNotIn('errorlist', form.render_row('a'))
+
+        self.assertFalse(form.is_valid())
+        self.assertEqual(list(form.errors.keys()), ['b'])
+        self.assertEqual(form.cleaned_data, dict(a='x'))
+
+        # The full render shows all errors
+        self.assertIn('errorlist', str(form.rows['b']))
+
+    def test_render_fieldset(self):
+        form = ExampleForm(dict())
+        html = form.render_fieldset('f2')
+
+        self.assertEqual(len(pq(u'<div>{0!s}</div>'.format(html))('.form-row')), 2)
+        self.assertEqual(list(form.partial_errors.keys()), ['example_type'])
+
+        with self.assertRaises(KeyError):
+            ExampleForm(dict()).render_fieldset('unknown')
+
+    def test_validated_form(self):
+        form = ExampleForm(dict())
+        form.full_clean()
+        form.render_row('name')
+
+        self.assertIn('__all__', form.errors)
+
+    def test_view(self):
+        client = Client()
+
+        response = client.post('/', {'pony_forms_row': 'name', 'example-name': ''})
+        self.assertEqual(response.status_code, 200)
+
+        data = response.json()
+        self.assertEqual(list(data['errors'].keys()), ['name'])
+        self.assertEqual(data['errors']['name'][0]['code'], 'required')
+        self.assertEqual(pq(data['html'])('input').attr('name'), 'example-name')
+
+        response = client.post('/', {'pony_forms_fieldset': 'f1', 'example-name': 'abc'})
+        self.assertEqual(response.json()['errors'], dict())
+
+        response = client.post('/', {'pony_forms_row': 'unknown'})
+        self.assertEqual(response.status_code, 400)
+
+        response = client.post('/', {'pony_forms_fieldset': 'unknown'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_view_error(self):
+        class BrokenForm(PonyFormMixin, forms.Form):
+            name = forms.CharField()
+
+            def clean_name(self):
+                return dict()['name']
+
+        view = Index.as_view(form_class=BrokenForm)
+        request = RequestFactory().post('/', {'pony_forms_row': 'name', 'name': 'abc'})
+
+        # An error in the form is not an unknown row
+        with self.assertRaises(KeyError):
+            view(request)
+
+
+class ValidationCacheTest(unittest.TestCase):
+    def setUp(self):
+        caches['default'].clear()
+
+    def create_form_class(self, **attrs):
+        calls = []
+
+        def validate_name(value):
+            calls.append(value)
+
+            if value == 'taken':
+                raise ValidationError('%(value)s is taken', code='taken', params=dict(value=value))
+
+        class CachedForm(PonyFormMixin, forms.Form):
+            use_validation_cache = True
+
+            name = forms.CharField(validators=[validate_name])
+
+            def clean_name(self):
+                return self.cleaned_data['name'].upper()
+
+        for (key, value) in attrs.items():
+            setattr(CachedForm, key, value)
+
+        return (CachedForm, calls)
+
+    def test_valid_value(self):
+        (form_class, calls) = self.create_form_class()
+
+        for _ in range(2):
+            form = form_class(dict(name='abc'))
+            self.assertTrue(form.is_valid())
+            self.assertEqual(form.cleaned_data, dict(name='ABC'))
+
+        self.assertEqual(calls, ['abc'])
+
+        form_class(dict(name='def')).is_valid()
+        self.assertEqual(calls, ['abc', 'def'])
+
+    def test_errors(self):
+        (form_class, calls) = self.create_form_class()
+
+        for _ in range(2):
+            form = form_class(dict(name='taken'))
+            self.assertEqual(form.errors.get_json_data(), dict(name=[dict(message='taken is taken', code='taken')]))
+            self.assertIn('taken is taken', str(form.rows['name']))
+
+        self.assertEqual(calls, ['taken'])
+
+    def test_opt_out(self):
+        (form_class, calls) = self.create_form_class(validation_cache_exclude=['name'])
+
+        form_class(dict(name='abc')).is_valid()
+        form_class(dict(name='abc')).is_valid()
+        self.assertEqual(calls, ['abc', 'abc'])
+
+    def test_disabled(self):
+        (form_class, calls) = self.create_form_class(use_validation_cache=False)
+
+        form_class(dict(name='abc')).is_valid()
+        form_class(dict(name='abc')).is_valid()
+        self.assertEqual(calls, ['abc', 'abc'])
+
+        # Django validates the form
+        with mock.patch.object(form_class, '_clean_field') as clean_field:
+            self.assertTrue(form_class(dict(name='abc')).is_valid())
+
+        clean_field.assert_not_called()
+
+    def test_limited_choices(self):
+        class ChoiceForm(PonyFormMixin, forms.Form):
+            use_validation_cache = True
+
+            choice = forms.ChoiceField(choices=[('a', 'A'), ('b', 'B')])
+
+            def __init__(self, allowed, *args, **kwargs):
+                super(ChoiceForm, self).__init__(*args, **kwargs)
+
+                self.fields['choice'].choices = [
+                    choice for choice in self.fields['choice'].choices if choice[0] in allowed
+                ]
+
+        self.assertTrue(ChoiceForm('ab', dict(choice='a')).is_valid())
+        self.assertFalse(ChoiceForm('b', dict(choice='a')).is_valid())
+
+
+class OptionCacheTest(unittest.TestCase):
+    class ChoicesWidgetWithLabel(forms.Select):
+        renders_label = True
+
+        def render(self, name, value, attrs, label):
+            return mark_safe(u'<label>{0!s}</label>'.format(label)) + super().render(name, value, attrs)
+
+    class ChoicesForm(PonyFormMixin, forms.Form):
+        country = forms.ChoiceField(
+            choices=[('', '---')] + [(i, 'Country <{0:d}>'.format(i)) for i in range(1000)]
+        )
+        region = forms.ChoiceField(
+            required=False,
+            choices=[('a', 'A'), ('Group', [('b', "B's"), ('c', 'C')]), ('b', 'B again')]
+        )
+        tags = forms.MultipleChoiceField(required=False, choices=[(1, 'x'), (2, 'y'), (3, 'z')])
+        with_label = forms.ChoiceField(required=False, choices=[(1, 'x'), (2, 'y')])
+        radio = forms.ChoiceField(required=False, choices=[(1, 'x'), (2, 'y')], widget=forms.RadioSelect)
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+
+            self.fields['with_label'].widget = OptionCacheTest.ChoicesWidgetWithLabel(
+                choices=self.fields['with_label'].choices
+            )
+
+    class CachedChoicesForm(ChoicesForm):
+        use_option_cache = True
+
+    def setUp(self):
+        option_cache.clear()
+
+    def assert_same_html(self, *args):
+        for _ in range(2):
+            self.assertEqual(str(self.CachedChoicesForm(*args)), str(self.ChoicesForm(*args)))
+
+    def test_same_html(self):
+        self.assert_same_html()
+        self.assert_same_html(dict(country='5', region='b', tags=['1', '3'], with_label='2'))
+        self.assert_same_html(dict(country='unknown', region='c', tags=['4']))
+
+        with translation.override('nl'):
+            self.assert_same_html(dict(country='10'))
+
+    def test_cache_is_used(self):
+        form = self.CachedChoicesForm()
+        str(form)
+        self.assertEqual(option_cache.info().misses, 4)
+
+        str(self.CachedChoicesForm(dict(country='999')))
+        self.assertEqual(option_cache.info().hits, 4)
+
+        # The radio widget is not cached
+        self.assertEqual(len(option_cache), 4)
+
+        key = cached_options.get_key(form.fields['country'].widget, form.renderer)
+        self.assertIsInstance(option_cache.get(key), cached_options.CachedOptions)
+
+    def test_formset(self):
+        formset_class = forms.formset_factory(self.CachedChoicesForm, formset=BaseExampleFormSet, extra=3)
+        self.assertEqual(
+            str(formset_class()),
+            str(forms.formset_factory(self.ChoicesForm, formset=BaseExampleFormSet, extra=3)())
+        )
+        self.assertEqual(option_cache.info().misses, 4)
+
+
+class ModelChoicesTest(TestCase):
+    class GroupForm(PonyFormMixin, forms.Form):
+        group = forms.ModelChoiceField(queryset=Group.objects.order_by('name'))
+        other_group = forms.ModelChoiceField(queryset=Group.objects.order_by('name'), required=False)
+        groups = forms.ModelMultipleChoiceField(queryset=Group.objects.order_by('name'), required=False)
+        no_groups = forms.ModelChoiceField(queryset=Group.objects.none(), required=False)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.groups = [Group.objects.create(name=name) for name in ['a', 'b', 'c']]
+
+    def test_one_query(self):
+        form = self.GroupForm(dict(group=self.groups[1].pk, groups=[self.groups[0].pk, self.groups[2].pk]))
+        self.assertTrue(form.is_valid())
+
+        # The three rows use the same query
+        with self.assertNumQueries(1):
+            html = str(form)
+
+        # Including the empty options of the other fields
+        self.assertEqual(len(pq(html)('option[selected]')), 5)
+
+        # Same html as Django
+        for field_name in form.fields:
+            self.assertEqual(str(form.rows[field_name].field), str(self.GroupForm(form.data)[field_name]))
+
+    def test_label_from_instance(self):
+        class LabelForm(self.GroupForm):
+            def __init__(self, *args, **kwargs):
+                super(LabelForm, self).__init__(*args, **kwargs)
+
+                self.fields['other_group'].label_from_instance = lambda obj: 'B:{0!s}'.format(obj.name)
+
+        form = LabelForm()
+
+        with self.assertNumQueries(1):
+            html = str(form)
+
+        self.assertEqual(
+            [option.text for option in pq(html)('#id_other_group option')],
+            ['---------', 'B:a', 'B:b', 'B:c']
+        )
+        self.assertEqual([option.text for option in pq(html)('#id_group option')], ['---------', 'a', 'b', 'c'])
+
+    def test_prefetch_related(self):
+        class PrefetchForm(self.GroupForm):
+            def __init__(self, *args, **kwargs):
+                super(PrefetchForm, self).__init__(*args, **kwargs)
+
+                self.fields['other_group'].queryset = Group.objects.order_by('name').prefetch_related('permissions')
+
+        # The prefetch query and the query without the prefetch
+        with self.assertNumQueries(3):
+            str(PrefetchForm())
+
+    def test_validation_cache(self):
+        class UserGroupForm(PonyFormMixin, forms.Form):
+            use_validation_cache = True
+
+            group = forms.ModelChoiceField(queryset=Group.objects.all())
+
+            def __init__(self, user_group_names, *args, **kwargs):
+                super(UserGroupForm, self).__init__(*args, **kwargs)
+
+                self.fields['group'].queryset = Group.objects.filter(name__in=user_group_names)
+
+        caches['default'].clear()
+        data = dict(group=self.groups[0].pk)
+
+        self.assertTrue(UserGroupForm(['a'], data).is_valid())
+        self.assertFalse(UserGroupForm(['b'], data).is_valid())
+
+    def test_formset(self):
+        formset_class = forms.formset_factory(self.GroupForm, formset=BaseExampleFormSet, extra=3)
+
+        with self.assertNumQueries(1):
+            str(formset_class())
+
+    def test_query_warning(self):
+        class WarningForm(self.GroupForm):
+            render_query_warning_threshold = 0
+
+        with self.assertWarns(queries.RenderQueriesWarning):
+            str(WarningForm())
+
+        counts = []
+
+        class HookForm(self.GroupForm):
+            render_query_warning_threshold = 1
+
+            def render_queries_exceeded(self, count, counter):
+                counts.append(count)
+
+        str(HookForm())
+        self.assertEqual(counts, [])
+
+
+class FieldsetTest(unittest.TestCase):
+    class FieldsetTemplateForm(ExampleForm):
+        fieldset_template = 'django_pony_forms/fieldset.html'
+        row_template = 'django_pony_forms/row.html'
+        errorlist_template = 'django_pony_forms/errorlist.html'
+
+    class Jinja2FieldsetTemplateForm(FieldsetTemplateForm):
+        template_engine = 'jinja2'
+
+    def test_memoized(self):
+        form = ExampleForm()
+
+        self.assertIs(form.fieldsets['f1'], form.fieldsets['f1'])
+        self.assertEqual(str(form.fieldsets['f1']), str(form.rows['name']))
+
+    def test_iterate(self):
+        form = ExampleForm()
+
+        self.assertEqual([fieldset.name for fieldset in form.fieldsets], ['f1', 'f2'])
+        self.assertEqual(list(form.fieldsets)[1].keys(), form.fieldsets['f2'].keys())
+        self.assertEqual(list(form.fieldsets['f2'].keys()), ['example_type', 'description'])
+
+    def test_fieldset_template(self):
+        form = self.FieldsetTemplateForm()
+        html = str(form.fieldsets['f2'])
+
+        d = pq(html)
+        self.assertEqual(d.attr('id'), 'fieldset-f2')
+        self.assertEqual(len(d('.form-row')), 2)
+
+        self.assertEqual(u''.join(self.FieldsetTemplateForm().fieldsets['f2'].iter_render()), html)
+        self.assertEqual(str(self.Jinja2FieldsetTemplateForm().fieldsets['f2']), html)
+
+    def test_check(self):
+        class UnknownFieldForm(PonyFormMixin, forms.Form):
+            name = forms.CharField()
+
+            fieldset_definitions = dict(first=['name', 'unknown'], second=None, third=[])
+
+        messages = [
+            warning.msg for warning in checks.check_fieldset_definitions(None)
+            if warning.obj in (UnknownFieldForm, ExampleForm)
+        ]
+        self.assertEqual(len(messages), 1)
+        self.assertIn("unknown field 'unknown'", messages[0])
+
+
+class LabelCacheTest(unittest.TestCase):
+    class TranslatedForm(PonyFormMixin, forms.Form):
+        password = forms.CharField(label=gettext_lazy('Password'), help_text=gettext_lazy('Password'))
+
+    def setUp(self):
+        label_cache.clear()
+
+    def test_languages(self):
+        for (language, text) in [('en', 'Password'), ('nl', 'Wachtwoord'), ('en', 'Password')]:
+            with translation.override(language):
+                row = self.TranslatedForm().rows['password']
+
+                self.assertEqual(row.label, '<label for="id_password">{0!s}</label>'.format(text))
+                self.assertEqual(row.help_text, text)
+                self.assertEqual(row._context['label_title'], text)
+
+        # Title, label tag and help text for two languages
+        self.assertEqual(label_cache.info().misses, 6)
+
+    def test_changed_label(self):
+        str(self.TranslatedForm())
+
+        form = self.TranslatedForm()
+        form.fields['password'].label = 'Secret'
+
+        self.assertEqual(form.rows['password'].label, '<label for="id_password">Secret</label>')
+        self.assertEqual(self.TranslatedForm().rows['password'].label, '<label for="id_password">Password</label>')
+
+    def test_formset(self):
+        formset_class = forms.formset_factory(self.TranslatedForm, formset=BaseExampleFormSet, extra=20)
+
+        html = str(formset_class())
+        misses = label_cache.info().misses
+
+        # The label title, the label tag and the help text are shared by all forms
+        self.assertEqual(misses, 3)
+
+        str(formset_class())
+        self.assertEqual(label_cache.info().misses, misses)
+
+        labels = pq(u'<div>{0!s}</div>'.format(html))('label')
+        self.assertEqual(len(labels), 20)
+        self.assertEqual(labels.eq(7).attr('for'), 'id_form-7-password')
+        self.assertEqual(labels.eq(7).text(), 'Password')
+
+    def test_jinja2(self):
+        class Jinja2Form(self.TranslatedForm):
+            template_engine = 'jinja2'
+
+        self.assertEqual(
+            Jinja2Form(auto_id='id_<&>_%s').rows['password'].label,
+            '<label for="id_&lt;&amp;&gt;_password">Password</label>'
+        )
+        self.assertEqual(Jinja2Form().rows['password'].label, '<label for="id_password">Password</label>')
+
+    def test_custom_label_template(self):
+        class CustomLabelForm(self.TranslatedForm):
+            label_template = 'input_type_label.html'
+
+        form = CustomLabelForm()
+        self.assertIn('data-input-type="text"', form.rows['password'].label)
+
+        form = CustomLabelForm()
+        form.fields['password'].widget = forms.PasswordInput()
+        self.assertIn('data-input-type="password"', form.rows['password'].label)
+
+        self.assertFalse(any(key[0] == 'label_tag' for key in label_cache._data))
+
+
+class WarmupTest(unittest.TestCase):
+    example_form_path = '{0!s}.ExampleForm'.format(ExampleForm.__module__)
+
+    def setUp(self):
+        template_cache.clear()
+        render_plan_cache.clear()
+
+    def test_warm_up_form_class(self):
+        result = warmup.warm_up_form_class(ExampleForm)
+
+        self.assertIsNone(result.error)
+        self.assertEqual(
+            result.template_names,
+            ['django_pony_forms/base_form.html', 'foundation_row.html', 'foundation_errorlist.html',
+             'django_pony_forms/label.html']
+        )
+        self.assertIn((None, 'foundation_row.html'), template_cache)
+        self.assertEqual(len(render_plan_cache), 1)
+
+    def test_form_with_arguments(self):
+        class FormWithArguments(ExampleForm):
+            def __init__(self, user, *args, **kwargs):
+                super(FormWithArguments, self).__init__(*args, **kwargs)
+
+        self.assertIsNone(warmup.warm_up_form_class(FormWithArguments).error)
+        self.assertEqual(len(render_plan_cache), 0)
+
+    def test_missing_template(self):
+        class MissingTemplateForm(ExampleForm):
+            row_template = 'missing.html'
+
+        self.assertIsInstance(warmup.warm_up_form_class(MissingTemplateForm).error, TemplateDoesNotExist)
+
+    def test_discover(self):
+        form_classes = warmup.discover_form_classes([self.example_form_path])
+
+        self.assertIs(form_classes[0], ExampleForm)
+        self.assertEqual(form_classes.count(ExampleForm), 1)
+        self.assertNotIn(PonyFormMixin, form_classes)
+
+    def test_preload(self):
+        # Remove the forms of other tests
+        gc.collect()
+
+        with override_settings(PONY_FORMS_PRELOAD=True, PONY_FORMS_WARMUP_FORMS=[self.example_form_path]):
+            with mock.patch('django_pony_forms.apps.connections.close_all') as close_all:
+                apps.get_app_config('django_pony_forms').ready()
+
+        self.assertIn((None, 'foundation_row.html'), template_cache)
+        close_all.assert_called_once_with()
+
+    def test_command(self):
+        out = StringIO()
+        call_command('pony_forms_warmup', self.example_form_path, stdout=out)
+
+        lines = out.getvalue().splitlines()
+        self.assertIn('{0!s} (4 templates)'.format(self.example_form_path), lines[0])
+        self.assertIn('Warmed up', lines[-1])
+
+
+class RowSkeletonTest(unittest.TestCase):
+    class DefaultTemplatesForm(PonyFormMixin, forms.Form):
+        name = forms.CharField(max_length=50, help_text='help <text>')
+        description = forms.CharField(required=False, label='')
+        code = forms.CharField(widget=forms.HiddenInput)
+        example_type = forms.ChoiceField(choices=[(1, 'abc'), (2, 'def')])
+        special = forms.CharField(required=False, label='<Special> & more')
+
+    class SkeletonForm(DefaultTemplatesForm):
+        use_row_skeletons = True
+
+    class Jinja2Form(DefaultTemplatesForm):
+        template_engine = 'jinja2'
+
+    class Jinja2SkeletonForm(Jinja2Form):
+        use_row_skeletons = True
+
+    def setUp(self):
+        skeleton_cache.clear()
+
+    def assert_same_html(self, form_class, skeleton_form_class):
+        for _ in range(2):
+            for (args, kwargs) in [
+                ((), {}),
+                ((dict(),), {}),
+                ((dict(name='a "name"', special='<b>', example_type='2'),), {}),
+                ((), dict(prefix='other')),
+                ((), dict(auto_id=False)),
+            ]:
+                self.assertEqual(str(skeleton_form_class(*args, **kwargs)), str(form_class(*args, **kwargs)))
+
+    def test_same_html(self):
+        self.assert_same_html(self.DefaultTemplatesForm, self.SkeletonForm)
+        self.assertGreater(skeleton_cache.info().hits, 0)
+
+    def test_jinja2(self):
+        self.assert_same_html(self.Jinja2Form, self.Jinja2SkeletonForm)
+        self.assertGreater(skeleton_cache.info().hits, 0)
+
+    def test_formset(self):
+        self.assertEqual(
+            str(forms.formset_factory(self.SkeletonForm, formset=BaseExampleFormSet, extra=3)()),
+            str(forms.formset_factory(self.DefaultTemplatesForm, formset=BaseExampleFormSet, extra=3)())
+        )
+
+    def test_template_is_not_rendered(self):
+        str(self.SkeletonForm())
+
+        template = get_cached_template(None, 'django_pony_forms/row.html')
+
+        with mock.patch.object(template, 'render', wraps=template.render) as render:
+            str(self.SkeletonForm())
+
+        self.assertEqual(render.call_count, 0)
+
+    def test_update_row_context(self):
+        class HookForm(ExampleForm):
+            use_row_skeletons = True
+
+        str(HookForm())
+        self.assertEqual(len(skeleton_cache), 0)
+
+    def test_dynamic_template(self):
+        class FormPrefixForm(self.SkeletonForm):
+            row_template = 'form_prefix_row.html'
+
+        self.assertIn('class="first"', str(FormPrefixForm(prefix='first')))
+        self.assertIn('class="second"', str(FormPrefixForm(prefix='second')))
+        self.assertFalse(any(value is not False for value in skeleton_cache._data.values()))
+
+    def test_text_values(self):
+        class ErrorClassForm(self.SkeletonForm):
+            row_template = 'error_class_row.html'
+            error_css_class = 'error'
+
+        self.assertNotIn('ERR', str(ErrorClassForm(dict(name='abc', code='1', example_type='1'))))
+        self.assertIn('ERR', str(ErrorClassForm(dict(code='1', example_type='1')).rows['name']))
+
+
+class RowsContextTest(unittest.TestCase):
+    class TooltipRowForm(PonyFormMixin, forms.Form):
+        row_template = 'tooltip_row.html'
+
+        name = forms.CharField()
+        description = forms.CharField()
+        code = forms.CharField(widget=forms.HiddenInput)
+
+        calls = []
+
+        def update_rows_context(self, bound_fields):
+            self.calls.append([bound_field.html_name for bound_field in bound_fields])
+
+            return {
+                bound_field: dict(tooltip='Tooltip {0!s}'.format(bound_field.html_name))
+                for bound_field in bound_fields
+            }
+
+    def setUp(self):
+        self.TooltipRowForm.calls.clear()
+
+    def test_form(self):
+        form = self.TooltipRowForm()
+        html = str(form)
+
+        self.assertEqual(self.TooltipRowForm.calls, [['name', 'description']])
+        self.assertEqual(pq(u'<div>{0!s}</div>'.format(html))('.tooltip').text(), 'Tooltip name Tooltip description')
+
+    def test_update_row_context_overrides(self):
+        class BothHooksForm(self.TooltipRowForm):
+            def update_row_context(self, bound_field):
+                if bound_field.name == 'name':
+                    return dict(tooltip='Row hook')
+                else:
+                    return dict()
+
+        self.assertEqual(
+            pq(u'<div>{0!s}</div>'.format(BothHooksForm()))('.tooltip').text(),
+            'Row hook Tooltip description'
+        )
+
+    def test_formset(self):
+        calls = []
+
+        class TooltipFormSet(BaseExampleFormSet):
+            def update_rows_context(self, bound_fields):
+                calls.append([bound_field.html_name for bound_field in bound_fields])
+
+                return {bound_field: dict(tooltip='Formset') for bound_field in bound_fields}
+
+        formset = forms.formset_factory(self.TooltipRowForm, formset=TooltipFormSet, extra=2)()
+        html = str(formset)
+
+        self.assertEqual(calls, [['form-0-name', 'form-0-description', 'form-1-name', 'form-1-description']])
+        self.assertEqual(self.TooltipRowForm.calls, [])
+        self.assertEqual(len(pq(u'<div>{0!s}</div>'.format(html))('.tooltip')), 4)
+
+
+class RenderQueriesModeTest(RenderQueriesTestMixin, TestCase):
+    class TooltipForm(PonyFormMixin, forms.Form):
+        name = forms.CharField()
+        group = forms.ModelChoiceField(queryset=Group.objects.order_by('name'))
+
+        row_template = 'tooltip_row.html'
+        render_query_warning_threshold = 1
+
+        def update_row_context(self, bound_field):
+            # One query for each row
+            return dict(tooltip=Group.objects.filter(name=bound_field.name).count())
+
+    @classmethod
+    def setUpTestData(cls):
+        Group.objects.create(name='a')
+
+    def test_warn(self):
+        with self.assertWarnsRegex(queries.RenderQueriesWarning, 'Queries by row: group: 2, name: 1'):
+            str(self.TooltipForm())
+
+    @override_settings(PONY_FORMS_RENDER_QUERIES_MODE='log')
+    def test_log(self):
+        with self.assertLogs('django_pony_forms.queries', 'WARNING') as logs:
+            str(self.TooltipForm())
+
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn('issued 3 queries while rendering; the threshold is 1', logs.output[0])
+        self.assertIn('Queries by row: group: 2, name: 1', logs.output[0])
+
+    @override_settings(PONY_FORMS_RENDER_QUERIES_MODE='raise')
+    def test_raise(self):
+        with self.assertRaisesMessage(queries.RenderQueriesError, 'Queries by row: group: 2, name: 1'):
+            str(self.TooltipForm())
+
+    @override_settings(PONY_FORMS_RENDER_QUERIES_MODE='raise')
+    def test_within_threshold(self):
+        class ThresholdForm(self.TooltipForm):
+            render_query_warning_threshold = 3
+
+        str(ThresholdForm())
+
+    @override_settings(PONY_FORMS_RENDER_QUERIES_MODE='raise')
+    def test_row_in_page_template(self):
+        form = self.TooltipForm()
+
+        # One query for the tooltip
+        str(form.rows['name'])
+
+        # The tooltip and the choices
+        with self.assertRaisesMessage(queries.RenderQueriesError, 'Queries by row: group: 2'):
+            str(form.rows['group'])
+
+    def test_field_outside_row(self):
+        form = self.TooltipForm()
+
+        with queries.count_queries() as counter:
+            str(form.rows['group'].field)
+
+        self.assertEqual(counter.counts_by_row, dict(group=1))
+
+    def test_assert_num_render_queries(self):
+        class NoThresholdForm(self.TooltipForm):
+            render_query_warning_threshold = None
+
+        html = self.assertNumRenderQueries(3, NoThresholdForm())
+        self.assertEqual(len(pq(html)('.tooltip')), 2)
+
+        with self.assertRaisesMessage(AssertionError, '3 queries while rendering, expected 2'):
+            self.assertNumRenderQueries(2, NoThresholdForm())
+
+        (html, counter) = count_render_queries(NoThresholdForm().rows['name'])
+        self.assertEqual(counter.count, 1)
+        self.assertEqual(counter.format_counts(), 'name: 1')
+
+
+class SchemaTest(unittest.TestCase):
+    def test_schema(self):
+        data = ExampleForm().get_schema().data
+
+        self.assertEqual(data['prefix'], 'example')
+        self.assertEqual([row['name'] for row in data['rows']], ['name', 'description', 'example_type'])
+        self.assertEqual(data['fieldsets'], dict(f1=['name'], f2=['example_type', 'description']))
+
+        name = data['rows'][0]
+        self.assertEqual(name['html_name'], 'example-name')
+        self.assertEqual(name['label'], 'Name')
+        self.assertEqual(name['help_text'], 'help text')
+        self.assertEqual(name['css_classes'], 'required')
+        self.assertEqual(name['template'], 'foundation_row.html')
+        self.assertFalse(name['renders_label'])
+        self.assertEqual(
+            name['widget'],
+            dict(
+                type='TextInput',
+                input_type='text',
+                attrs=dict(id='id_example-name', maxlength='50', required=True),
+            )
+        )
+
+        self.assertTrue(data['rows'][1]['renders_label'])
+        self.assertEqual(
+            data['rows'][2]['widget']['choices'],
+            [dict(value=1, label='abc'), dict(value=2, label='def')]
+        )
+
+        self.assertEqual(
+            data['hidden_fields'],
+            [
+                dict(
+                    name='code',
+                    html_name='example-code',
+                    widget=dict(type='HiddenInput', input_type='hidden', attrs=dict(id='id_example-code')),
+                )
+            ]
+        )
+
+    def test_per_instance(self):
+        schema = ExampleForm().get_schema()
+
+        # Same ETag for a bound form
+        self.assertEqual(ExampleForm(dict(name='abc')).get_schema().etag, schema.etag)
+
+        class UserForm(ExampleForm):
+            def __init__(self, user, *args, **kwargs):
+                super(UserForm, self).__init__(*args, **kwargs)
+
+                self.fields['example_type'].choices = [(user, 'Choice of {0!s}'.format(user))]
+                self.fields['name'].label = 'Name of {0!s}'.format(user)
+                self.fields['name'].required = user == 'alice'
+
+        alice_schema = UserForm('alice').get_schema()
+        bob_schema = UserForm('bob').get_schema()
+
+        self.assertNotEqual(alice_schema.etag, bob_schema.etag)
+        self.assertEqual(bob_schema.data['rows'][0]['label'], 'Name of bob')
+        self.assertFalse(bob_schema.data['rows'][0]['required'])
+        self.assertEqual(bob_schema.data['rows'][2]['widget']['choices'], [dict(value='bob', label='Choice of bob')])
+
+        class NoDescriptionForm(ExampleForm):
+            def __init__(self, *args, **kwargs):
+                super(NoDescriptionForm, self).__init__(*args, **kwargs)
+
+                del self.fields['description']
+
+        other_schema = NoDescriptionForm().get_schema()
+        self.assertNotEqual(other_schema.etag, schema.etag)
+        self.assertEqual(len(other_schema.data['rows']), 2)
+
+    def test_data_payload(self):
+        self.assertEqual(
+            ExampleForm().get_data_payload(),
+            dict(
+                values=dict(name=None, description=None, code=None, example_type=None),
+                errors=dict(),
+            )
+        )
+
+        payload = ExampleForm({'example-name': 'abc', 'example-example_type': '3'}).get_data_payload()
+        self.assertEqual(payload['values']['name'], 'abc')
+        self.assertEqual(set(payload['errors'].keys()), {'__all__', 'code', 'example_type'})
+
+    def test_data_payload_file_and_password(self):
+        class AccountForm(PonyFormMixin, forms.Form):
+            avatar = forms.FileField()
+            password = forms.CharField(widget=forms.PasswordInput)
+            pin = forms.CharField(widget=forms.PasswordInput(render_value=True))
+
+        form = AccountForm(
+            dict(password='secret', pin='1234'),
+            dict(avatar=SimpleUploadedFile('avatar.png', b'png'))
+        )
+        payload = form.get_data_payload()
+
+        self.assertEqual(payload['values'], dict(avatar=None, password=None, pin='1234'))
+        json.dumps(payload)
+
+    def test_view(self):
+        client = Client()
+
+        response = client.get('/', {'pony_forms_schema': ''})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), ExampleForm().get_schema().data)
+
+        etag = response['ETag']
+        self.assertEqual(etag, '"{0!s}"'.format(ExampleForm().get_schema().etag))
+
+        response = client.get('/', {'pony_forms_schema': ''}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        response = client.get('/', {'pony_forms_data': ''})
+        self.assertEqual(response.json()['errors'], dict())
+
+        response = client.post('/', {'pony_forms_data': '', 'example-name': 'abc'})
+        self.assertEqual(response.json()['values']['name'], 'abc')
+        self.assertIn('code', response.json()['errors'])
+
+
+class RowFragmentCacheTest(unittest.TestCase):
+    class CachedRowForm(PonyFormMixin, forms.Form):
+        name = forms.CharField(max_length=10, help_text='Name')
+        kind = forms.ChoiceField(choices=[('a', 'A'), ('b', 'B')])
+        description = forms.CharField(required=False, widget=forms.Textarea)
+
+        use_row_fragment_cache = True
+
+    def setUp(self):
+        row_fragment_cache.clear()
+
+    def get_uncached_html(self, data):
+        class UncachedForm(self.CachedRowForm):
+            use_row_fragment_cache = False
+
+        return str(UncachedForm(data))
+
+    def test_rerender(self):
+        data = dict(name='abcdefghijklmnop', kind='c', description='')
+
+        html = str(self.CachedRowForm(data))
+        self.assertEqual(row_fragment_cache.info().hits, 0)
+        self.assertEqual(len(row_fragment_cache), 3)
+
+        # Same value and errors: from the cache
+        self.assertEqual(str(self.CachedRowForm(data)), html)
+        self.assertEqual(row_fragment_cache.info().hits, 3)
+        self.assertEqual(html, self.get_uncached_html(data))
+
+        # Only the changed row is rendered
+        changed_data = dict(data, kind='a')
+        changed_html = str(self.CachedRowForm(changed_data))
+
+        self.assertEqual(row_fragment_cache.info().hits, 5)
+        self.assertEqual(len(row_fragment_cache), 4)
+        self.assertEqual(changed_html, self.get_uncached_html(changed_data))
+        self.assertNotIn('errorlist', str(self.CachedRowForm(changed_data).rows['kind']))
+
+    def test_form_and_widget_state(self):
+        data = dict(name='abc', kind='a')
+        html = str(self.CachedRowForm(data))
+
+        self.assertEqual(len(pq(u'<div>{0!s}</div>'.format(html))('[required]')), 1)
+
+        html_without_required = str(self.CachedRowForm(data, use_required_attribute=False))
+        self.assertEqual(len(pq(u'<div>{0!s}</div>'.format(html_without_required))('[required]')), 0)
+        self.assertNotEqual(
+            row_fragments.get_key(self.CachedRowForm(data, label_suffix='!').rows['name']),
+            row_fragments.get_key(self.CachedRowForm(data).rows['name'])
+        )
+
+        class DateForm(self.CachedRowForm):
+            date = forms.DateField(widget=forms.DateInput(format='%d-%m-%Y'))
+
+            def __init__(self, *args, date_format=None, **kwargs):
+                super(DateForm, self).__init__(*args, **kwargs)
+
+                if date_format:
+                    self.fields['date'].widget.format = date_format
+
+        initial = dict(date=datetime.date(2020, 1, 31))
+        self.assertIn('31-01-2020', str(DateForm(initial=initial).rows['date']))
+        self.assertIn('2020/01/31', str(DateForm(initial=initial, date_format='%Y/%m/%d').rows['date']))
+
+        self.assertEqual(str(self.CachedRowForm(data)), html)
+
+    def test_language(self):
+        str(self.CachedRowForm())
+
+        with translation.override('nl'):
+            str(self.CachedRowForm())
+
+        self.assertEqual(row_fragment_cache.info().hits, 0)
+
+    def test_template_uses_form(self):
+        class FormPrefixForm(self.CachedRowForm):
+            row_template = 'form_prefix_row.html'
+
+        self.assertIn('class="first"', str(FormPrefixForm(prefix='first')))
+        self.assertIn('class="second"', str(FormPrefixForm(auto_id=False, prefix='second')))
+        self.assertFalse(any(value is not False for value in row_fragment_cache._data.values()))
+
+    def test_not_cached(self):
+        class HookForm(self.CachedRowForm):
+            def update_row_context(self, bound_field):
+                return dict()
+
+        str(HookForm())
+        self.assertEqual(len(row_fragment_cache), 0)
+
+        class ModelChoiceForm(self.CachedRowForm):
+            group = forms.ModelChoiceField(queryset=Group.objects.none())
+
+        self.assertIsNone(row_fragments.get_key(ModelChoiceForm().rows['group']))
+        self.assertIsNotNone(row_fragments.get_key(ModelChoiceForm().rows['name']))
@@ -1,8 +1,10 @@
 from django.views import generic
 
+from django_pony_forms.views import FormSchemaMixin, LiveValidationMixin
+
 from . import forms
 
 
-class Index(generic.FormView):
+class Index(FormSchemaMixin, LiveValidationMixin, generic.FormView):
     template_name = 'index.html'
     form_class = forms.ExampleForm